@@ -0,0 +1,20 @@
+import pygame
+
+
+# Process-wide cache of every sprite that has been loaded, keyed by file path
+_sprites = {}
+
+
+def load_sprite(path: str) -> pygame.Surface:
+    """
+    Returns the sprite stored at <path>. The image is only read from disk the first time it is requested, every
+    later call hands back the same shared Surface.
+    """
+    sprite = _sprites.get(path)
+    if sprite is None:
+        sprite = pygame.image.load(path)
+        # Match the display pixel format so blitting the sprite does not convert it every frame
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        _sprites[path] = sprite
+    return sprite
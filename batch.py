@@ -0,0 +1,419 @@
+import numpy as np
+from flood import split_regions
+from map import DIRECTIONS, TURNS
+from settings import *
+
+
+# Lookup tables shared by every game in a batch
+_DIRECTIONS = np.array(DIRECTIONS + ((0, 0),))
+_TURNS = np.array([TURNS[False], TURNS[True]])
+
+
+class BatchEngine:
+    """
+    Simulates <count> games in lockstep with the same rules as Engine. Every game is stored in NumPy arrays indexed
+    by game first, so one call to <step> advances all of them at once.
+
+    Player, Qix and Sparx movement and the perimeter updates after a capture are vectorized across games. Only the
+    region labeling of a capture runs one game at a time, with the same split_regions used by Map. A stranded Sparx
+    jumps to the first perimeter cell in row order, and Sparx beyond <max_sparx> are not spawned.
+
+    Attributes:
+        count (int): number of games in the batch
+        size (int): the length of every square map
+        max_sparx (int): number of Sparx slots per game, a game uses as many slots as its level
+        grid (np.ndarray): (count, size, size) uint8, 1 iff the cell is captured
+        wire (np.ndarray): (count, size, size) bool, True iff the cell is part of the wire
+        wire_length (np.ndarray): (count,) number of wire cells
+        wire_start (np.ndarray): (count, 2) x and y of the cell the wire started from
+        perimeter (np.ndarray): (count, size, size) bool, True iff the cell is on the captured perimeter
+        links (np.ndarray): (count, size, size) uint8 perimeter link bitmasks, see map.TURNS
+        player (np.ndarray): (count, 2) x and y of the Player
+        qix (np.ndarray): (count, 2) x and y of the Qix
+        qix_direction (np.ndarray): (count, 2) x and y velocity of the Qix
+        sparx (np.ndarray): (count, max_sparx, 2) x and y of every Sparx
+        sparx_direction (np.ndarray): (count, max_sparx) index into DIRECTIONS, -1 until the Sparx is oriented
+        sparx_clockwise (np.ndarray): (count, max_sparx) bool, every other Sparx starts out travelling clockwise
+        sparx_active (np.ndarray): (count, max_sparx) bool, True iff the Sparx slot is in play
+        player_progress (np.ndarray): (count,) movement accumulated by the Player, see Entity.advance
+        qix_progress (np.ndarray): (count,) movement accumulated by the Qix
+        sparx_progress (np.ndarray): (count,) movement accumulated by the Sparx, which all spawn together
+        captured (np.ndarray): (count,) number of captured cells
+        lives (np.ndarray): (count,) player lives
+        invulnerable (np.ndarray): (count,) ticks left before the player can be hit again
+        level (np.ndarray): (count,) difficulty of the current level
+        goal (np.ndarray): (count,) capture percentage needed to clear the level
+        rng (np.random.Generator): random source of every game in the batch
+    """
+    # Private Attributes:
+    #   _games (np.ndarray): index of every game, used to gather one cell per game
+    #   _start_perimeter (np.ndarray): perimeter of a freshly set up map
+    #   _start_links (np.ndarray): perimeter links of a freshly set up map
+    #   _start_cells (np.ndarray): x and y of every cell on <_start_perimeter>
+
+    count: int
+    size: int
+    max_sparx: int
+    grid: np.ndarray
+    wire: np.ndarray
+    wire_length: np.ndarray
+    wire_start: np.ndarray
+    perimeter: np.ndarray
+    links: np.ndarray
+    player: np.ndarray
+    qix: np.ndarray
+    qix_direction: np.ndarray
+    sparx: np.ndarray
+    sparx_direction: np.ndarray
+    sparx_clockwise: np.ndarray
+    sparx_active: np.ndarray
+    player_progress: np.ndarray
+    qix_progress: np.ndarray
+    sparx_progress: np.ndarray
+    captured: np.ndarray
+    lives: np.ndarray
+    invulnerable: np.ndarray
+    level: np.ndarray
+    goal: np.ndarray
+    rng: np.random.Generator
+    _games: np.ndarray
+    _start_perimeter: np.ndarray
+    _start_links: np.ndarray
+    _start_cells: np.ndarray
+
+    def __init__(self, count: int, size: int, difficulty: int, max_sparx: int = 8, seed: int = None) -> None:
+        """
+        Initialize <count> games on maps of <size> starting at <difficulty>, with random spawns drawn from <seed>
+        """
+        self.count = count
+        self.size = size
+        self.max_sparx = max_sparx
+        self.rng = np.random.default_rng(seed)
+        self._games = np.arange(count)
+
+        # Every level starts from the same map, so its perimeter only has to be worked out once
+        start = np.zeros((1, size, size), dtype=np.uint8)
+        start[:, 0, :] = start[:, -1, :] = start[:, :, 0] = start[:, :, -1] = 1
+        self._start_perimeter = _perimeter(start)[0]
+        self._start_links = _links(self._start_perimeter[None])[0]
+        ys, xs = np.nonzero(self._start_perimeter)
+        self._start_cells = np.stack([xs, ys], axis=1)
+
+        self.grid = np.zeros((count, size, size), dtype=np.uint8)
+        self.wire = np.zeros((count, size, size), dtype=bool)
+        self.wire_length = np.zeros(count, dtype=np.int64)
+        self.wire_start = np.zeros((count, 2), dtype=np.int64)
+        self.perimeter = np.zeros((count, size, size), dtype=bool)
+        self.links = np.zeros((count, size, size), dtype=np.uint8)
+        self.player = np.zeros((count, 2), dtype=np.int64)
+        self.qix = np.zeros((count, 2), dtype=np.int64)
+        self.qix_direction = np.zeros((count, 2), dtype=np.int64)
+        self.sparx = np.zeros((count, max_sparx, 2), dtype=np.int64)
+        self.sparx_direction = np.full((count, max_sparx), -1, dtype=np.int64)
+        self.sparx_clockwise = np.zeros((count, max_sparx), dtype=bool)
+        self.sparx_active = np.zeros((count, max_sparx), dtype=bool)
+        self.player_progress = np.zeros(count)
+        self.qix_progress = np.zeros(count)
+        self.sparx_progress = np.zeros(count)
+        self.captured = np.zeros(count, dtype=np.int64)
+        self.lives = np.full(count, 3, dtype=np.int64)
+        self.invulnerable = np.zeros(count, dtype=np.int64)
+        self.level = np.full(count, difficulty, dtype=np.int64)
+        self.goal = np.full(count, 60, dtype=np.int64)
+
+        self.set_up_level(np.ones(count, dtype=bool))
+
+    def step(self, actions: np.ndarray) -> dict:
+        """
+        Advances every game by one tick, game i performing the action flags in <actions>[i], and returns the
+        resulting state
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+
+        # Check if minimum goal percentage is met
+        level_cleared = self.captured * 100 // self.size ** 2 >= self.goal
+        if level_cleared.any():
+            self.goal[level_cleared & (self.goal <= 85)] += 5
+            self.level[level_cleared] += 1
+            self.set_up_level(level_cleared)
+
+        player_start, sparx_start = self.player.copy(), self.sparx.copy()
+
+        # Each entity moves at its own speed, a Player that is not due to move acts as if nothing was pressed
+        self._move_player(np.where(_advance(self.player_progress, PLAYER_SPEED), actions, NO_ACTION))
+        self._move_qix(_advance(self.qix_progress, QIX_SPEED))
+        self._move_sparx(_advance(self.sparx_progress, SPARX_SPEED))
+
+        self._collide(player_start, sparx_start)
+
+        return self.state(level_cleared)
+
+    def state(self, level_cleared: np.ndarray = None) -> dict:
+        """
+        Returns the positions and scores of every game, the same fields as Engine.state with one entry per game
+        """
+        if level_cleared is None:
+            level_cleared = np.zeros(self.count, dtype=bool)
+        return {
+            "player": self.player.copy(),
+            "qix": self.qix.copy(),
+            "sparx": self.sparx.copy(),
+            "sparx_active": self.sparx_active.copy(),
+            "wire_length": self.wire_length.copy(),
+            "lives": self.lives.copy(),
+            "level": self.level.copy(),
+            "captured": self.captured * 100 // self.size ** 2,
+            "goal": self.goal.copy(),
+            "level_cleared": level_cleared,
+            "game_over": self.lives <= 0,
+        }
+
+    def set_up_level(self, games: np.ndarray) -> None:
+        """
+        Sets up the level of every game selected by the boolean mask <games> to its initial state
+        """
+        chosen = int(games.sum())
+        self.grid[games] = 0
+        self.grid[games, 0, :] = self.grid[games, -1, :] = 1
+        self.grid[games, :, 0] = self.grid[games, :, -1] = 1
+        self.captured[games] = 4 * self.size - 4
+        self.perimeter[games] = self._start_perimeter
+        self.links[games] = self._start_links
+        self.wire[games] = False
+        self.wire_length[games] = 0
+
+        # Player is always spawned in the middle of the bottom row, the Qix randomly in the uncaptured field
+        self.player[games] = (self.size // 2, self.size - 1)
+        self.qix[games] = self.rng.integers(1, self.size - 1, size=(chosen, 2))
+        self.qix_direction[games] = self.rng.choice([-1, 1], size=(chosen, 2))
+
+        # Sparx are spawned randomly along the perimeter, one per level
+        self.sparx_active[games] = np.arange(self.max_sparx) < self.level[games, None]
+        self.sparx[games] = self._start_cells[self.rng.integers(len(self._start_cells),
+                                                                size=(chosen, self.max_sparx))]
+        self.sparx_direction[games] = -1
+        self.sparx_clockwise[games] = np.arange(self.max_sparx) % 2 == 0
+        self.invulnerable[games] = 0
+        self.player_progress[games] = self.qix_progress[games] = self.sparx_progress[games] = 0
+
+    def _at(self, array: np.ndarray, games: np.ndarray, x: np.ndarray, y: np.ndarray, outside) -> np.ndarray:
+        """
+        Returns array[games, y, x] for every selected cell, or <outside> for cells off the map
+        """
+        inside = (x >= 0) & (x < self.size) & (y >= 0) & (y < self.size)
+        values = array[games, np.clip(y, 0, self.size - 1), np.clip(x, 0, self.size - 1)]
+        return np.where(inside, values, outside)
+
+    def _move_player(self, actions: np.ndarray) -> None:
+        """
+        Moves every Player following Player.move
+        """
+        games = self._games
+        x, y = self.player[:, 0].copy(), self.player[:, 1].copy()
+
+        # Left and right take priority over up and down
+        dx = np.where(actions & LEFT, -1, np.where(actions & RIGHT, 1, 0))
+        dy = np.where(dx == 0, np.where(actions & UP, -1, np.where(actions & DOWN, 1, 0)), 0)
+        new_x, new_y = x + dx, y + dy
+        push = (actions & PUSH) != 0
+        new_on_perimeter = self._at(self.perimeter, games, new_x, new_y, False)
+
+        # Pushing onto uncaptured territory extends the wire, starting it from the current cell if needed
+        advance = push & ~self._at(self.grid, games, new_x, new_y, 1).astype(bool) \
+            & ~self._at(self.wire, games, new_x, new_y, False)
+        start = advance & (self.wire_length == 0)
+        self.wire[games[start], y[start], x[start]] = True
+        self.wire_start[start] = self.player[start]
+        self.wire_length[start] += 1
+        x[advance], y[advance] = new_x[advance], new_y[advance]
+        self.wire[games[advance], y[advance], x[advance]] = True
+        self.wire_length[advance] += 1
+
+        # Returning to captured territory closes the wire
+        closing = push & ~self.grid[games, y, x].astype(bool) & new_on_perimeter
+        if closing.any():
+            self._capture(np.flatnonzero(closing))
+        x[closing], y[closing] = new_x[closing], new_y[closing]
+
+        # Without pushing the Player can only move along the perimeter
+        sliding = ~push & new_on_perimeter & self.perimeter[games, self.player[:, 1], self.player[:, 0]]
+        x[sliding], y[sliding] = new_x[sliding], new_y[sliding]
+
+        self.player[:, 0], self.player[:, 1] = x, y
+
+    def _capture(self, games: np.ndarray) -> None:
+        """
+        Captures the wire of every game in <games> and every region it split off except the largest one, following
+        Map.capture_field
+        """
+        wire = self.wire[games]
+        grid = self.grid[games]
+        captured = np.count_nonzero(wire & (grid == 0), axis=(1, 2))
+        grid[wire] = 1
+
+        # Every uncaptured cell touching the wire belongs to one of the regions the wire may have split off
+        near_wire = np.zeros(wire.shape, dtype=bool)
+        near_wire[:, 1:, :] |= wire[:, :-1, :]
+        near_wire[:, :-1, :] |= wire[:, 1:, :]
+        near_wire[:, :, 1:] |= wire[:, :, :-1]
+        near_wire[:, :, :-1] |= wire[:, :, 1:]
+        seeds = (near_wire & (grid == 0)).reshape(len(games), -1)
+
+        # Labeling the regions is the only part done one game at a time
+        flat_grid = grid.reshape(len(games), -1)
+        for i in range(len(games)):
+            regions = split_regions(bytearray(flat_grid[i].tobytes()), self.size, np.flatnonzero(seeds[i]).tolist())
+            if regions:
+                cells = np.fromiter((index for region in regions for index in region), dtype=np.int64)
+                flat_grid[i, cells] = 1
+                captured[i] += len(cells)
+
+        self.grid[games] = grid
+        self.captured[games] += captured
+        self.perimeter[games] = perimeter = _perimeter(grid)
+        self.links[games] = _links(perimeter)
+        self.wire[games] = False
+        self.wire_length[games] = 0
+
+    def _collide(self, player_start: np.ndarray, sparx_start: np.ndarray) -> None:
+        """
+        Takes a life from every game where the Qix touches the wire or a Sparx touches the Player or passes through
+        them on its way from <sparx_start> while the Player moved from <player_start>, following Engine.collide
+        """
+        player = self.player[:, None, :]
+        on_player = (self.sparx == player).all(axis=2)
+        crossed = (sparx_start == player).all(axis=2) & (self.sparx == player_start[:, None, :]).all(axis=2)
+        hit_sparx = self.sparx_active & (on_player | crossed)
+        hit = hit_sparx.any(axis=1) | self.wire[self._games, self.qix[:, 1], self.qix[:, 0]]
+
+        # Players that were hit recently cannot be hit again yet
+        protected = self.invulnerable > 0
+        self.invulnerable[protected] -= 1
+        hit &= ~protected
+        hit_sparx &= hit[:, None]
+
+        # Sparx turn around after touching the player
+        self.sparx_clockwise[hit_sparx] = ~self.sparx_clockwise[hit_sparx]
+        turned = hit_sparx & (self.sparx_direction != -1)
+        self.sparx_direction[turned] = (self.sparx_direction[turned] + 2) % 4
+
+        # Remove the wire and send the player back to where it started
+        self.lives[hit] -= 1
+        self.invulnerable[hit] = INVULNERABLE_TICKS
+        reset = hit & (self.wire_length > 0)
+        self.player[reset] = self.wire_start[reset]
+        self.wire[reset] = False
+        self.wire_length[reset] = 0
+
+    def _move_qix(self, moving: np.ndarray) -> None:
+        """
+        Moves the Qix of every game selected by the boolean mask <moving> following Qix.move
+        """
+        # 1/6 chance for the qix velocity to change
+        change = moving & (self.rng.integers(6, size=self.count) == 0)
+        self.qix_direction[change] = self.rng.choice([-1, 1], size=(int(change.sum()), 2))
+
+        # Spawn Qix on a random uncaptured cell if stuck, the k-th open cell for a uniformly drawn k
+        x, y = self.qix[:, 0], self.qix[:, 1]
+        stuck = moving & self.grid[self._games, y, x].astype(bool)
+        if stuck.any():
+            open_cells = (self.grid[stuck].reshape(int(stuck.sum()), -1) == 0).cumsum(axis=1)
+            counts = open_cells[:, -1]
+            found = counts > 0
+            picked = (self.rng.random(len(counts)) * counts).astype(open_cells.dtype)
+            cell = (open_cells > picked[:, None]).argmax(axis=1)[found]
+            stuck[stuck] = found
+            self.qix[stuck, 0], self.qix[stuck, 1] = cell % self.size, cell // self.size
+            x, y = self.qix[:, 0], self.qix[:, 1]
+
+        # Bounce off captured cells with the opposite velocity
+        dx, dy = self.qix_direction[:, 0], self.qix_direction[:, 1]
+        bounce_x = moving & self._at(self.grid, self._games, x + dx, y, 1).astype(bool)
+        bounce_y = moving & self._at(self.grid, self._games, x, y + dy, 1).astype(bool)
+        dx[bounce_x] *= -1
+        dy[bounce_y] *= -1
+
+        self.qix[moving] += self.qix_direction[moving]
+
+    def _move_sparx(self, moving: np.ndarray) -> None:
+        """
+        Moves every active Sparx of the games selected by the boolean mask <moving> following Sparx.move
+        """
+        flat_perimeter = self.perimeter.reshape(self.count, -1)
+        moving = self.sparx_active & (moving & flat_perimeter.any(axis=1))[:, None]
+        games = np.broadcast_to(self._games[:, None], moving.shape)
+        x, y = self.sparx[..., 0], self.sparx[..., 1]
+
+        # A stranded Sparx jumps back onto the perimeter and has to be oriented again
+        stranded = moving & ~self.perimeter[games, y, x]
+        if stranded.any():
+            first = flat_perimeter.argmax(axis=1)[games[stranded]]
+            x[stranded], y[stranded] = first % self.size, first // self.size
+            self.sparx_direction[stranded] = -1
+
+        links = self.links[games, y, x]
+        clockwise = self.sparx_clockwise
+
+        # Face clockwise or counter-clockwise along the perimeter, following Map.start_direction
+        unoriented = moving & (self.sparx_direction == -1)
+        if unoriented.any():
+            chosen = np.full(moving.shape, -1)
+            for i, (dx, dy) in enumerate(DIRECTIONS):
+                side_x = np.where(clockwise, -dy, dy)
+                side_y = np.where(clockwise, dx, -dx)
+                open_side = (self._at(self.grid, games, x + side_x, y + side_y, 1) == 0) \
+                    | (self._at(self.grid, games, x + dx + side_x, y + dy + side_y, 1) == 0)
+                chosen = np.where((chosen == -1) & (links >> i & 1 == 1) & open_side, i, chosen)
+            fallback = _TURNS[clockwise.astype(np.int64), links, 0]
+            chosen = np.where(chosen == -1, fallback, chosen)
+            self.sparx_direction[unoriented] = chosen[unoriented]
+
+        # Follow the perimeter, turning wherever it turns. A Sparx that was just oriented already faces the way it
+        # leaves its cell and is not turned again.
+        turn = _TURNS[clockwise.astype(np.int64), links, np.maximum(self.sparx_direction, 0)]
+        turn = np.where(unoriented, self.sparx_direction, turn)
+        self.sparx_direction[moving] = np.where(turn[moving] == -1, self.sparx_direction[moving], turn[moving])
+        step = _DIRECTIONS[np.where(turn == -1, 4, turn)]
+        x[moving] += step[moving][:, 0]
+        y[moving] += step[moving][:, 1]
+
+
+def _advance(progress: np.ndarray, speed: float) -> np.ndarray:
+    """
+    Accumulates one tick of movement at <speed> into <progress> and returns True for every game whose entity is due
+    to move this tick, following Entity.advance
+    """
+    progress += speed
+    moving = progress >= TICK_RATE
+    progress[moving] -= TICK_RATE
+    return moving
+
+
+def _perimeter(grid: np.ndarray) -> np.ndarray:
+    """
+    Returns True for every captured cell of the (games, rows, columns) <grid> that is adjacent to an uncaptured cell,
+    cells beyond the edges count as captured
+    """
+    games, rows, columns = grid.shape
+    open_cells = np.zeros((games, rows + 2, columns + 2), dtype=bool)
+    open_cells[:, 1:-1, 1:-1] = grid == 0
+
+    # The 3x3 neighbourhood is checked as a row of three followed by a column of three
+    near_open = open_cells[:, :, :-2] | open_cells[:, :, 1:-1] | open_cells[:, :, 2:]
+    near_open = near_open[:, :-2] | near_open[:, 1:-1] | near_open[:, 2:]
+    return (grid == 1) & near_open
+
+
+def _links(perimeter: np.ndarray) -> np.ndarray:
+    """
+    Returns the bitmask of adjacent perimeter cells of every cell of the boolean (games, rows, columns) <perimeter>,
+    0 for cells that are not on it
+    """
+    games, rows, columns = perimeter.shape
+    padded = np.zeros((games, rows + 2, columns + 2), dtype=np.uint8)
+    padded[:, 1:-1, 1:-1] = perimeter
+    links = np.zeros(perimeter.shape, dtype=np.uint8)
+    for bit, (dx, dy) in enumerate(DIRECTIONS):
+        links |= padded[:, 1 + dy:1 + dy + rows, 1 + dx:1 + dx + columns] << bit
+    links[~perimeter] = 0
+    return links
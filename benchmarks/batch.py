@@ -0,0 +1,57 @@
+"""
+Measures simulation throughput of a Python loop over Engine instances against BatchEngine.
+
+Run from the repository root:
+    python -m benchmarks.batch [--counts 1 64 1024 4096] [--steps 200] [--size 25] [--difficulty 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from batch import BatchEngine
+from engine import Engine
+
+
+def engine_rate(count: int, size: int, difficulty: int, steps: int) -> float:
+    """
+    Returns the env-steps per second of <count> Engine instances stepped one after another with random actions
+    """
+    engines = [Engine(size, difficulty, seed) for seed in range(count)]
+    actions = np.random.default_rng(0).integers(0, 32, size=(steps, count)).tolist()
+    start = time.perf_counter()
+    for tick in actions:
+        for engine, action in zip(engines, tick):
+            engine.step(action)
+    return steps * count / (time.perf_counter() - start)
+
+
+def batch_rate(count: int, size: int, difficulty: int, steps: int) -> float:
+    """
+    Returns the env-steps per second of one BatchEngine of <count> games with random actions
+    """
+    batch = BatchEngine(count, size, difficulty, seed=0)
+    actions = np.random.default_rng(0).integers(0, 32, size=(steps, count))
+    start = time.perf_counter()
+    for tick in actions:
+        batch.step(tick)
+    return steps * count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--size", type=int, default=25)
+    parser.add_argument("--difficulty", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'games':>6} {'engine steps/min':>17} {'batch steps/min':>16} {'speedup':>8}")
+    for count in args.counts:
+        looped = engine_rate(min(count, 256), args.size, args.difficulty, args.steps)
+        batched = batch_rate(count, args.size, args.difficulty, args.steps)
+        print(f"{count:>6} {looped * 60:>17,.0f} {batched * 60:>16,.0f} {batched / looped:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
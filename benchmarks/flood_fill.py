@@ -0,0 +1,114 @@
+"""
+Compares the scanline flood fill in flood.py against the recursive flood fill it replaced.
+
+Run from the repository root:
+    python -m benchmarks.flood_fill [--sizes 25 100 500 2000] [--repeat 3]
+"""
+import argparse
+import sys
+import threading
+import time
+
+from flood import flood_fill
+
+
+# The recursive version needs one Python frame per filled cell, so it is only run on grids it can survive
+RECURSIVE_LIMIT = 300
+
+
+def recursive_flood_fill(matrix: list, x: int, y: int) -> None:
+    """
+    The original recursive flood fill from Map, working on a list of lists of booleans
+    """
+    if not matrix[y][x]:
+        matrix[y][x] = True
+        recursive_flood_fill(matrix, x - 1, y)
+        recursive_flood_fill(matrix, x + 1, y)
+        recursive_flood_fill(matrix, x, y - 1)
+        recursive_flood_fill(matrix, x, y + 1)
+
+
+def make_field(size: int, shape: str) -> bytearray:
+    """
+    Returns a flat <size> by <size> field with a captured border. The "open" shape is one empty region, the "comb"
+    shape adds walls on every other column with alternating gaps, which turns the region into one long corridor.
+    """
+    field = bytearray(size * size)
+    for i in range(size):
+        field[i] = field[(size - 1) * size + i] = 1
+        field[i * size] = field[i * size + size - 1] = 1
+    if shape == "comb":
+        for x in range(2, size - 2, 2):
+            gap = size - 2 if (x // 2) % 2 else 1
+            for y in range(1, size - 1):
+                if y != gap:
+                    field[y * size + x] = 1
+    return field
+
+
+def time_scanline(field: bytearray, size: int, repeat: int) -> tuple:
+    """
+    Returns the best time of <repeat> scanline fills from the middle of <field> and the number of cells filled
+    """
+    best, filled = float("inf"), 0
+    for _ in range(repeat):
+        matrix = bytearray(field)
+        start = time.perf_counter()
+        filled = flood_fill(matrix, size, 1, 1)
+        best = min(best, time.perf_counter() - start)
+    return best, filled
+
+
+def time_recursive(field: bytearray, size: int, repeat: int) -> tuple:
+    """
+    Returns the best time of <repeat> recursive fills of <field> and the number of cells filled. Runs on a thread
+    with a large stack since the recursion is as deep as the region is big.
+    """
+    result = []
+
+    def run() -> None:
+        best, filled = float("inf"), 0
+        for _ in range(repeat):
+            matrix = [[bool(field[y * size + x]) for x in range(size)] for y in range(size)]
+            before = sum(row.count(True) for row in matrix)
+            start = time.perf_counter()
+            recursive_flood_fill(matrix, 1, 1)
+            best = min(best, time.perf_counter() - start)
+            filled = sum(row.count(True) for row in matrix) - before
+        result.append((best, filled))
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(size * size + 1000)
+    threading.stack_size(512 * 1024 * 1024)
+    try:
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(0)
+        sys.setrecursionlimit(limit)
+    return result[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 200, 500, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'shape':<6} {'size':>6} {'cells':>10} {'scanline ms':>12} {'recursive ms':>13} {'speedup':>8}")
+    for shape in ("open", "comb"):
+        for size in args.sizes:
+            field = make_field(size, shape)
+            scanline, filled = time_scanline(field, size, args.repeat)
+            if size <= RECURSIVE_LIMIT:
+                recursive, expected = time_recursive(field, size, args.repeat)
+                assert filled == expected, f"fills disagree on {shape} {size}: {filled} != {expected}"
+                columns = f"{recursive * 1000:>13.2f} {recursive / scanline:>7.1f}x"
+            else:
+                columns = f"{'skipped':>13} {'-':>8}"
+            print(f"{shape:<6} {size:>6} {filled:>10} {scanline * 1000:>12.2f} {columns}")
+
+
+if __name__ == "__main__":
+    main()
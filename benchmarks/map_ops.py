@@ -0,0 +1,176 @@
+"""
+Times the Map operations and the Player and Sparx moves across grid sizes and reports time and peak memory as JSON,
+to track performance regressions between releases. Runs without a display. The largest sizes search millions of
+cells per run and take minutes.
+
+Run from the repository root:
+    python -m benchmarks.map_ops [--sizes 25 100 500 1000 2000] [--repeat 3] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import Engine
+from map import Map
+from settings import *
+
+
+def straight_cut(size: int) -> list:
+    """
+    Returns a wire straight down the field a third of the way across it
+    """
+    return [(size // 3, y) for y in range(1, size - 1)]
+
+
+def l_cut(size: int) -> list:
+    """
+    Returns an L-shaped wire from the top edge down to the middle of the field and across to the right edge
+    """
+    x = size // 3
+    return [(x, y) for y in range(1, size // 2)] + [(x, size // 2)] + [(i, size // 2) for i in range(x + 1, size - 1)]
+
+
+def spiral_cut(size: int) -> list:
+    """
+    Returns a wire that enters from the left edge and winds inwards clockwise, turning whenever it gets within a
+    corridor's width of the border or of itself. The corridor keeps the field in one piece, so capturing it explores
+    the whole field. It is a tenth of the field wide, so the spiral makes the same number of turns at every size.
+    """
+    corridor = max(2, size // 10)
+    x, y = 1, corridor + 1
+    wire = [(x, y)]
+    cells = {(x, y)}
+    direction = 0
+    directions = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+    def open_ahead(dx: int, dy: int) -> bool:
+        ahead = [(x + i * dx, y + i * dy) for i in range(1, corridor + 2)]
+        return 0 < ahead[-1][0] < size - 1 and 0 < ahead[-1][1] < size - 1 and not cells.intersection(ahead)
+
+    while True:
+        if not open_ahead(*directions[direction]):
+            direction = (direction + 1) % 4
+            if not open_ahead(*directions[direction]):
+                return wire
+        dx, dy = directions[direction]
+        x, y = x + dx, y + dy
+        wire.append((x, y))
+        cells.add((x, y))
+
+
+CUTS = {"straight": straight_cut, "l_shape": l_cut, "spiral": spiral_cut}
+
+
+def measure(setup: callable, operation: callable, repeat: int) -> dict:
+    """
+    Returns the best time of <repeat> runs of <operation> on a fresh result of <setup> and its peak memory, which is
+    measured in a separate run so tracing does not slow the timed runs down
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        subject = setup()
+        start = time.perf_counter()
+        operation(subject)
+        best = min(best, time.perf_counter() - start)
+
+    subject = setup()
+    tracemalloc.start()
+    operation(subject)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def lay_wire(map: Map, wire: list) -> Map:
+    """
+    Pushes every cell of <wire> onto <map> the way the Player does and returns <map>
+    """
+    for x, y in wire:
+        map.push(x, y)
+    return map
+
+
+def captured_cut(size: int) -> tuple:
+    """
+    Returns a new map of <size> with the straight cut and the field left of it captured the way capture_field does,
+    but with its perimeter not updated yet, along with the cells that changed
+    """
+    map = Map(size)
+    changed = straight_cut(size) + [(x, y) for y in range(1, size - 1) for x in range(1, size // 3)]
+    for x, y in changed:
+        map.capture(x, y)
+    return map, changed
+
+
+def player_cut(engine: Engine) -> None:
+    """
+    Slides the Player along the bottom edge and then pushes it straight up across the field, capturing on arrival
+    """
+    for action, steps in ((LEFT, engine.size // 4), (UP | PUSH, engine.size - 1)):
+        engine.action = action
+        for _ in range(steps):
+            engine.player.move(engine)
+
+
+def sparx_laps(engine: Engine) -> None:
+    """
+    Moves every Sparx once around the whole border
+    """
+    for sparx in engine.sparx_list:
+        for _ in range(4 * engine.size):
+            sparx.move(engine)
+
+
+def benchmark(size: int, repeat: int) -> list:
+    """
+    Returns the results of every operation on a map of <size>
+    """
+    results = []
+
+    def add(operation: str, setup: callable, run: callable, **details) -> None:
+        result = measure(setup, run, repeat)
+        results.append({"operation": operation, "size": size, **details, **result})
+
+    add("construct", lambda: size, Map)
+    base = Map(size)
+    add("capture_percentage", lambda: base, lambda map: [map.capture_percentage() for _ in range(1000)], calls=1000)
+    add("update_perimeter", lambda: captured_cut(size), lambda cut: cut[0].update_perimeter(cut[1]),
+        cells=len(captured_cut(size)[1]))
+    for name, cut in CUTS.items():
+        wire = cut(size)
+        add("capture_field", lambda: lay_wire(Map(size), wire), Map.capture_field, wire=name, wire_length=len(wire))
+    add("flood_fill", lambda: bytearray(base.grid), lambda grid: base.flood_fill(grid, size // 2, size // 2))
+    add("player_move", lambda: Engine(size, DIFFICULTY, 0), player_cut, moves=size // 4 + size - 1)
+    add("sparx_move", lambda: Engine(size, DIFFICULTY, 0), sparx_laps, moves_per_sparx=4 * size)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 100, 500, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(benchmark(size, args.repeat))
+
+    report = {"python": platform.python_version(), "machine": platform.machine(), "repeat": args.repeat,
+              "results": results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures how much memory a Map takes per cell, once built and at its peak while it is built, and how big each kind
+of entity is, and reports it as JSON, to track the memory cost of large maps between releases. Runs without a display.
+
+Run from the repository root:
+    python -m benchmarks.memory [--sizes 100 500 1000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import Engine
+from map import Map
+from settings import *
+
+
+def map_memory(size: int) -> dict:
+    """
+    Returns the memory held by a new map of <size> once it is built, in total and per cell, and the peak memory
+    while building it
+    """
+    tracemalloc.start()
+    map = Map(size)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del map
+    return {"size": size, "bytes": current, "bytes_per_cell": current / size ** 2, "peak_bytes": peak,
+            "peak_bytes_per_cell": peak / size ** 2}
+
+
+def object_size(entity: object) -> int:
+    """
+    Returns the bytes taken by <entity> itself and its instance dictionary if it has one
+    """
+    size = sys.getsizeof(entity)
+    if hasattr(entity, "__dict__"):
+        size += sys.getsizeof(entity.__dict__)
+    return size
+
+
+def entity_sizes() -> dict:
+    """
+    Returns the bytes taken by one of each kind of entity
+    """
+    engine = Engine(GRIDSIZE, 1, 0)
+    return {type(entity).__name__: object_size(entity) for entity in (engine.player, engine.qix, engine.sparx_list[0])}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "maps": [map_memory(size) for size in args.sizes], "entities": entity_sizes()}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
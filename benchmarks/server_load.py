@@ -0,0 +1,175 @@
+"""
+Measures how many sessions one game server process sustains. Starts the server on a Unix socket in its own process,
+where it runs on a single core, then for every session count connects that many clients playing random actions and
+reports how many of the ticks they asked for they actually got, as JSON. A session count is sustained when at least
+95% of the ticks arrive. Clients whose game is over join a new one, so the load stays constant.
+
+Run from the repository root:
+    python -m benchmarks.server_load [--sessions 100 250 500 1000] [--seconds 5] [--rate 7] [--size 25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from server import DELTA, DELTA_HEADER, END, JOIN, MAGIC, VERSION, read_frame
+from settings import *
+
+
+# Share of the requested ticks a session count has to get to count as sustained
+SUSTAINED = 0.95
+
+
+class Load:
+    """
+    Counters shared by all the clients of one run
+
+    Attributes:
+        measuring (bool): True iff ticks and frames are being counted
+        ticks (int): ticks the clients got while measuring
+        frames (int): frames received while measuring
+        received (int): bytes received while measuring
+        games (int): games started, including the ones started after a game ended
+        joined (int): clients whose first game has started sending frames
+    """
+
+    measuring: bool
+    ticks: int
+    frames: int
+    received: int
+    games: int
+    joined: int
+
+    def __init__(self) -> None:
+        """
+        Initialize all counters to zero
+        """
+        self.measuring = False
+        self.ticks = 0
+        self.frames = 0
+        self.received = 0
+        self.games = 0
+        self.joined = 0
+
+
+async def client(path: str, seed: int, size: int, rate: int, load: Load, stop: asyncio.Event) -> None:
+    """
+    Plays games seeded from <seed> on the server at <path> with random actions until <stop> is set
+    """
+    rng = random.Random(seed)
+    joined = False
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+        except OSError:
+            # The server's listen backlog is full, it will have room again once it accepted the waiting clients
+            await asyncio.sleep(0.05)
+            continue
+        writer.write(JOIN.pack(MAGIC, VERSION, size, 1, rng.getrandbits(32), rate))
+        load.games += 1
+        last_tick = 0
+        try:
+            while not stop.is_set():
+                kind, payload = await read_frame(reader)
+                if not joined:
+                    joined = True
+                    load.joined += 1
+                if kind == END:
+                    break
+                if kind == DELTA:
+                    tick = DELTA_HEADER.unpack_from(payload)[0]
+                    if load.measuring:
+                        load.ticks += tick - last_tick
+                        load.frames += 1
+                        load.received += len(payload)
+                    last_tick = tick
+                    # Changes direction every second or so and cuts into the field half of the time
+                    if rng.random() < 1 / rate:
+                        writer.write(bytes((rng.choice((LEFT, RIGHT, UP, DOWN)) | rng.choice((0, PUSH)),)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run(path: str, sessions: int, size: int, rate: int, seconds: float) -> dict:
+    """
+    Returns how well the server at <path> keeps <sessions> games of <size> at <rate> ticks per second going over
+    <seconds> seconds, measured from a second after every client got its first frame
+    """
+    load = Load()
+    stop = asyncio.Event()
+    tasks = []
+    for seed in range(sessions):
+        tasks.append(asyncio.create_task(client(path, seed, size, rate, load, stop)))
+    while load.joined < sessions:
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(1)
+
+    load.measuring = True
+    start = time.perf_counter()
+    await asyncio.sleep(seconds)
+    load.measuring = False
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    delivered = load.ticks / (sessions * rate * elapsed)
+    return {"sessions": sessions, "seconds": elapsed, "ticks": load.ticks, "delivered": delivered,
+            "sustained": delivered >= SUSTAINED, "frames_per_second": load.frames / elapsed,
+            "bytes_per_frame": load.received / load.frames if load.frames else 0.0, "games": load.games}
+
+
+def start_server(path: str, size: int, rate: int) -> subprocess.Popen:
+    """
+    Returns a server process listening on a Unix socket at <path> once it accepts connections
+    """
+    process = subprocess.Popen([sys.executable, "-m", "server", "--unix", path, "--max-size", str(size),
+                                "--max-rate", str(rate)], stderr=subprocess.DEVNULL)
+    while not os.path.exists(path):
+        if process.poll() is not None:
+            raise RuntimeError("the server exited before it started listening")
+        time.sleep(0.05)
+    return process
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rate", type=int, default=TICK_RATE)
+    parser.add_argument("--size", type=int, default=GRIDSIZE)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for sessions in args.sessions:
+            # A fresh server for every count, so sessions left over from the last run do not add to the load
+            path = os.path.join(directory, f"server-{sessions}.sock")
+            process = start_server(path, args.size, args.rate)
+            try:
+                results.append(asyncio.run(run(path, sessions, args.size, args.rate, args.seconds)))
+            finally:
+                process.terminate()
+                process.wait()
+
+    sustained = [result["sessions"] for result in results if result["sustained"]]
+    report = {"python": platform.python_version(), "machine": platform.machine(), "rate": args.rate,
+              "size": args.size, "max_sustained_sessions": max(sustained, default=0), "results": results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
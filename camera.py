@@ -0,0 +1,98 @@
+import pygame
+from settings import *
+
+
+class Camera:
+    """
+    The part of the field that is shown on the screen. The view only scrolls once the followed cell gets within
+    <margin> cells of its edge, so a field of any size is drawn through a window of the same size.
+
+    Attributes:
+        size (int): the length of the square map in cells
+        view (pygame.Rect): area of the screen the field is drawn in
+        margin (int): cells kept between the followed cell and the edge of the view when the field allows it
+        x (int): horizontal pixel of the field shown at the left edge of <view>
+        y (int): vertical pixel of the field shown at the top edge of <view>
+    """
+
+    size: int
+    view: pygame.Rect
+    margin: int
+    x: int
+    y: int
+
+    def __init__(self, size: int, view: pygame.Rect, margin: int = CAMERA_MARGIN) -> None:
+        """
+        Initialize the camera on a map of <size> shown through <view>, starting at the top left corner of the field
+        """
+        self.size = size
+        self.view = view
+        self.margin = margin
+        self.x = 0
+        self.y = 0
+
+    @property
+    def offset(self) -> tuple:
+        """
+        Returns what is added to the pixel coordinates of a point on the field to get its position on the screen
+        """
+        return self.view.left - self.x, self.view.top - self.y
+
+    def center(self, x: float, y: float) -> None:
+        """
+        Moves the view so that the cell at <x> and <y> is in its middle, or as close to it as the field allows
+        """
+        self.x = self._clamp(round(x * TILE_SIZE) - (self.view.width - TILE_SIZE) // 2, self.view.width)
+        self.y = self._clamp(round(y * TILE_SIZE) - (self.view.height - TILE_SIZE) // 2, self.view.height)
+
+    def follow(self, x: float, y: float) -> bool:
+        """
+        Moves the view as little as possible to keep the cell at <x> and <y> at least <margin> cells away from its
+        edges and returns true iff the view moved. Fractional coordinates scroll the view smoothly.
+        """
+        new_x = self._follow_axis(self.x, x, self.view.width)
+        new_y = self._follow_axis(self.y, y, self.view.height)
+        moved = (new_x, new_y) != (self.x, self.y)
+        self.x, self.y = new_x, new_y
+        return moved
+
+    def visible_cells(self) -> tuple:
+        """
+        Returns the ranges of x and y coordinates of the cells that are at least partly inside the view
+        """
+        return (range(self.x // TILE_SIZE, min(self.size, (self.x + self.view.width - 1) // TILE_SIZE + 1)),
+                range(self.y // TILE_SIZE, min(self.size, (self.y + self.view.height - 1) // TILE_SIZE + 1)))
+
+    def cells_in(self, rect: pygame.Rect) -> iter:
+        """
+        Yields the visible cells covered by the screen area <rect>
+        """
+        columns, rows = self.visible_cells()
+        left, top = self.offset
+        for x in range(max(columns.start, (rect.left - left) // TILE_SIZE),
+                       min(columns.stop, (rect.right - 1 - left) // TILE_SIZE + 1)):
+            for y in range(max(rows.start, (rect.top - top) // TILE_SIZE),
+                           min(rows.stop, (rect.bottom - 1 - top) // TILE_SIZE + 1)):
+                yield x, y
+
+    def cell_rect(self, x: int, y: int) -> pygame.Rect:
+        """
+        Returns the area of the screen covered by the cell at <x> and <y>, cut down to the part inside the view
+        """
+        left, top = self.offset
+        return pygame.Rect(x * TILE_SIZE + left, y * TILE_SIZE + top, TILE_SIZE, TILE_SIZE).clip(self.view)
+
+    def _follow_axis(self, start: int, position: float, length: int) -> int:
+        """
+        Returns where a view <length> pixels long that starts at <start> has to start along one axis to follow the
+        cell at <position> on that axis
+        """
+        pixel = round(position * TILE_SIZE)
+        margin = self.margin * TILE_SIZE
+        return self._clamp(min(max(start, pixel + TILE_SIZE + margin - length), pixel - margin), length)
+
+    def _clamp(self, start: int, length: int) -> int:
+        """
+        Returns <start> limited so a view <length> pixels long stays on the field
+        """
+        return max(0, min(start, self.size * TILE_SIZE - length))
@@ -0,0 +1,149 @@
+import bisect
+import itertools
+import random
+from array import array
+
+
+class CellSet:
+    """
+    A set of cell coordinates that also supports indexing, so a random cell can be picked in O(1). Membership,
+    insertion and removal are O(1). Cells keep their insertion order until one is removed, removal moves the last
+    cell into the freed slot.
+    """
+    # Private Attributes:
+    #   _cells (list(tuples)): every cell in the set
+    #   _positions (dict): index of each cell in <_cells>
+
+    _cells: list
+    _positions: dict
+
+    def __init__(self, cells: iter = ()) -> None:
+        """
+        Initialize the set with the given <cells>
+        """
+        self._cells = []
+        self._positions = {}
+        for cell in cells:
+            self.add(cell)
+
+    def add(self, cell: tuple) -> None:
+        """
+        Adds <cell> to the set if it is not in it already
+        """
+        if cell not in self._positions:
+            self._positions[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell: tuple) -> None:
+        """
+        Removes <cell> from the set if it is in it
+        """
+        position = self._positions.pop(cell, None)
+        if position is not None:
+            last = self._cells.pop()
+            if position < len(self._cells):
+                self._cells[position] = last
+                self._positions[last] = position
+
+    def clear(self) -> None:
+        """
+        Removes every cell from the set
+        """
+        self._cells = []
+        self._positions = {}
+
+    def __contains__(self, cell: tuple) -> bool:
+        return cell in self._positions
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __iter__(self) -> iter:
+        return iter(self._cells)
+
+    def __getitem__(self, index: int) -> tuple:
+        return self._cells[index]
+
+
+class GridCells:
+    """
+    The cells of a <size> by <size> grid like Map.grid whose byte is 0. Only the number of those cells in every row
+    is kept, so the set takes four bytes per row rather than per cell. A random cell is picked by its rank in row
+    order, so which cell is picked depends only on the grid and two grids with the same cells pick the same one.
+    Membership and removal are O(1), picking a random cell is O(size).
+    """
+    # Private Attributes:
+    #   _grid (bytearray): the grid the set reads its cells from, shared with its owner
+    #   _size (int): the length of the square grid
+    #   _rows (array): number of cells in the set on each row
+    #   _count (int): number of cells in the set
+
+    _grid: bytearray
+    _size: int
+    _rows: array
+    _count: int
+
+    def __init__(self, grid: bytearray, size: int) -> None:
+        """
+        Initialize the set with every cell of the flat <size> by <size> <grid> whose byte is 0
+        """
+        self._grid = grid
+        self._size = size
+        self.recount()
+
+    def recount(self) -> None:
+        """
+        Counts the cells of every row again after the grid was changed without calling discard
+        """
+        size = self._size
+        self._rows = array("i", (self._grid.count(0, start, start + size) for start in range(0, size * size, size)))
+        self._count = sum(self._rows)
+
+    def discard(self, cell: tuple) -> None:
+        """
+        Removes <cell> from the set, called right after its byte in the grid changed from 0
+        """
+        self._rows[cell[1]] -= 1
+        self._count -= 1
+
+    def sample(self, rng: random.Random = random) -> tuple:
+        """
+        Returns a cell of the set picked uniformly at random with <rng>, or None if the set is empty
+        """
+        if not self._count:
+            return None
+        rank = rng.randrange(self._count)
+        totals = list(itertools.accumulate(self._rows))
+        y = bisect.bisect_right(totals, rank)
+        if y:
+            rank -= totals[y - 1]
+
+        # Skip over the cells of the row that come before the one picked
+        index = self._grid.find(0, y * self._size)
+        for _ in range(rank):
+            index = self._grid.find(0, index + 1)
+        return index - y * self._size, y
+
+    def copy(self, grid: bytearray) -> 'GridCells':
+        """
+        Returns an independent set reading its cells from <grid>, a copy of the grid of this set
+        """
+        clone = GridCells.__new__(GridCells)
+        clone._grid = grid
+        clone._size = self._size
+        clone._rows = array("i", self._rows)
+        clone._count = self._count
+        return clone
+
+    def __contains__(self, cell: tuple) -> bool:
+        x, y = cell
+        return 0 <= x < self._size and 0 <= y < self._size and not self._grid[y * self._size + x]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> iter:
+        index = self._grid.find(0)
+        while index != -1:
+            yield index % self._size, index // self._size
+            index = self._grid.find(0, index + 1)
@@ -0,0 +1,56 @@
+from cellset import CellSet
+
+
+class OccupancyGrid:
+    """
+    An index of what occupies each cell of the field, so a collision is found with one lookup per entity instead of
+    comparing every entity against every other entity and every wire cell
+
+    Attributes:
+        wire (CellSet): cells covered by the wire
+    """
+    # Private Attributes:
+    #   _cells (dict): set of entities standing on each occupied cell
+    #   _positions (dict): cell each entity was last placed on
+
+    wire: CellSet
+    _cells: dict
+    _positions: dict
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty index
+        """
+        self.wire = CellSet()
+        self._cells = {}
+        self._positions = {}
+
+    def place(self, entity: 'Entity') -> tuple:
+        """
+        Moves <entity> to its current cell in the index and returns the cell it was on before, or None if it was not
+        in the index yet
+        """
+        cell = (entity.x, entity.y)
+        previous = self._positions.get(entity)
+        if previous != cell:
+            if previous is not None:
+                occupants = self._cells[previous]
+                occupants.discard(entity)
+                if not occupants:
+                    del self._cells[previous]
+            self._cells.setdefault(cell, set()).add(entity)
+            self._positions[entity] = cell
+        return previous
+
+    def occupants(self, cell: tuple) -> set:
+        """
+        Returns the entities standing on <cell>
+        """
+        return self._cells.get(cell, set())
+
+    def sync_wire(self, wire: CellSet) -> None:
+        """
+        Indexes the cells of <wire>. The wire keeps its own cell set up to date as it is drawn, so it is shared
+        rather than copied and lookups always see the current wire.
+        """
+        self.wire = wire
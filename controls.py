@@ -0,0 +1,156 @@
+import collections
+import time
+from profiler import PROFILER
+from settings import *
+
+
+DIRECTION_FLAGS = (LEFT, RIGHT, UP, DOWN)
+
+
+class InputQueue:
+    """
+    Turns key presses and releases into the action of every tick. Presses are queued with the time they happened, so
+    a tap that starts and ends between two ticks still moves the player on the next tick. When several directions are
+    held the one pressed last wins, so every action has at most one direction. Up to <buffer> taps made faster than
+    the tick rate are kept and played out one per tick, with no buffer only the latest tap is played.
+
+    Nothing here depends on pygame, a headless Engine can be fed the same presses and releases, see play.
+
+    Attributes:
+        buffer (int): most taps kept waiting for a later tick
+        latencies (collections.deque): nanoseconds between each press and the tick that acted on it, most recent last
+    """
+    # Private Attributes:
+    #   _held (collections.Counter): number of keys held down for each action flag
+    #   _directions (list): direction flags being held in the order they were pressed
+    #   _taps (collections.deque): (flag, time) of the direction presses no tick has acted on yet
+    #   _push_time (int): time of the push press no tick has acted on yet, or None
+
+    buffer: int
+    latencies: collections.deque
+    _held: collections.Counter
+    _directions: list
+    _taps: collections.deque
+    _push_time: int
+
+    def __init__(self, buffer: int = INPUT_BUFFER, window: int = 300) -> None:
+        """
+        Initialize an empty queue keeping up to <buffer> taps for later ticks and the latency of the last <window>
+        presses acted on
+        """
+        self.buffer = buffer
+        self.latencies = collections.deque(maxlen=window)
+        self._held = collections.Counter()
+        self._directions = []
+        self._taps = collections.deque()
+        self._push_time = None
+
+    def press(self, flag: int, when: int = None) -> None:
+        """
+        Records a key for the action <flag> going down at <when> nanoseconds, now if no time is given. A second key
+        for an action that is already held only keeps the action held.
+        """
+        when = time.perf_counter_ns() if when is None else when
+        self._held[flag] += 1
+        if self._held[flag] > 1:
+            return
+
+        if flag == PUSH:
+            self._push_time = when
+        elif flag in DIRECTION_FLAGS:
+            self._directions.append(flag)
+            self._taps.append((flag, when))
+            # The oldest taps make way for new ones, one is always kept for the next tick
+            while len(self._taps) > self.buffer + 1:
+                self._taps.popleft()
+
+    def release(self, flag: int) -> None:
+        """
+        Records a key for the action <flag> going up, the action stays held while another key for it is down
+        """
+        if self._held[flag] == 0:
+            return
+        self._held[flag] -= 1
+        if self._held[flag] == 0 and flag in self._directions:
+            self._directions.remove(flag)
+
+    def clear(self) -> None:
+        """
+        Releases every key and forgets every press, used when the window loses focus and key releases go missing
+        """
+        self._held.clear()
+        self._directions = []
+        self._taps.clear()
+        self._push_time = None
+
+    def next_action(self, now: int = None) -> int:
+        """
+        Returns the action of the tick starting at <now> nanoseconds, now if no time is given. The oldest waiting tap
+        is played first, or the latest one without a buffer, otherwise the direction held down last.
+        """
+        now = time.perf_counter_ns() if now is None else now
+        action = NO_ACTION
+
+        if self._taps:
+            if not self.buffer:
+                while len(self._taps) > 1:
+                    self._taps.popleft()
+            flag, when = self._taps.popleft()
+            action |= flag
+            self._measure(when, now)
+        elif self._directions:
+            action |= self._directions[-1]
+
+        if self._push_time is not None:
+            self._measure(self._push_time, now)
+            self._push_time = None
+            action |= PUSH
+        elif self._held[PUSH]:
+            action |= PUSH
+        return action
+
+    def latency_stats(self) -> dict:
+        """
+        Returns the number of presses measured and the mean, 95th percentile and maximum input latency in
+        milliseconds over the recent ones
+        """
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {"count": 0, "mean": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered) / 1e6,
+            "p95": ordered[min(len(ordered) - 1, len(ordered) * 95 // 100)] / 1e6,
+            "max": ordered[-1] / 1e6,
+        }
+
+    def _measure(self, when: int, now: int) -> None:
+        """
+        Records the latency of a press at <when> acted on by the tick at <now>, also as the "input_latency" section
+        of the profiler while it is enabled
+        """
+        self.latencies.append(now - when)
+        if PROFILER.enabled:
+            PROFILER.add("input_latency", when, now - when)
+
+
+def play(commands: list, tick_length: int, buffer: int = INPUT_BUFFER) -> iter:
+    """
+    Yields the action of every tick for <commands>, a list of (time, flag, pressed) sorted by time in nanoseconds
+    with <pressed> False for a release, when a tick starts every <tick_length> nanoseconds from time 0. Stops at the
+    first tick after the last command, so an Engine can be stepped with the same input the Game would have read.
+    """
+    queue = InputQueue(buffer)
+    i = 0
+    tick = 0
+    while i < len(commands):
+        now = tick * tick_length
+        while i < len(commands) and commands[i][0] <= now:
+            when, flag, pressed = commands[i]
+            if pressed:
+                queue.press(flag, when)
+            else:
+                queue.release(flag)
+            i += 1
+        yield queue.next_action(now)
+        tick += 1
@@ -0,0 +1,297 @@
+import random
+import struct
+import zlib
+from collision import OccupancyGrid
+from map import Map
+from player import Player
+from profiler import PROFILER
+from qix import Qix
+from sparx import Sparx
+from snapshot import ENGINE_HEADER, ENGINE_MAGIC, RNG_STATE, SNAPSHOT_VERSION, pack_rng, unpack_rng
+from settings import *
+
+
+class Engine:
+    """
+    The headless simulation of the game rules. It never touches the display, loads no assets and never sleeps, every
+    call to <step> advances the game by exactly one tick.
+
+    Attributes:
+        size (int): the length of the square map
+        action (int): the player action of the current tick, a combination of the action flags in settings
+        rng (random.Random): source of every random spawn and Qix turn, seeded to make a game reproducible
+        map (Map): a Map object containing all of the field information
+        player (Player): instance of the player in the game
+        sparx_list (list): list of all sparx objects
+        qix (Qix): entity that roams around the uncaptured territory
+        occupancy (OccupancyGrid): which cells the Sparx and the wire occupy, used to detect collisions
+    """
+    # Private Attibutes:
+    #   _invulnerable (int): ticks left before the player can be hit again
+    #   _goal_percentage(int): Goal of captured field in current game
+    #   _difficulty: the difficulty of the stage
+    #   _lives (int): player total lives
+    #   _pristine (Map): the map every level starts from, None until it is given, kept from a fresh map or built the
+    #       first time a level is prepared ahead of time
+    #   _next_map (Map): copy of <_pristine> prepared ahead of time for the next level, or None
+
+    size: int
+    action: int
+    rng: random.Random
+    map: Map
+    player: Player
+    sparx_list: list
+    qix: Qix
+    occupancy: OccupancyGrid
+    _invulnerable: int
+    _goal_percentage: int
+    _difficulty: int
+    _lives: int
+    _pristine: Map
+    _next_map: Map
+
+    def __init__(self, size: int, difficulty: int, seed: int = None, pristine: Map = None) -> None:
+        """
+        Initialize the simulation by setting the field map to <size> and creating the starting level. Games created
+        with the same <seed> play out the same for the same actions. Every level starts from a copy of <pristine> if
+        one is given, a new map of <size> that is never changed and may be shared between games, instead of from a
+        map built from scratch.
+        """
+        self.action = NO_ACTION
+        self.rng = random.Random(seed)
+
+        # Set starting <goal> percentage and difficulty
+        self._goal_percentage = 60
+        self._difficulty = difficulty
+
+        # Set all entity attributes
+        self.sparx_list = []
+        self.size = size
+        self.qix = None
+        self.map = None
+        self.occupancy = None
+        self._pristine = pristine
+        self._next_map = None
+
+        self._lives = 3
+        self._invulnerable = 0
+
+        # Creates the initial state of a level
+        self.set_up_level()
+
+    def step(self, action: int) -> dict:
+        """
+        Advances the game by one tick with the player performing <action> and returns the resulting state
+        """
+        # Check if minimum goal percentage is met
+        level_cleared = self._goal_percentage <= self.map.capture_percentage()
+        if level_cleared:
+            self.level_up()
+
+        # Update all entity movement according to their specific <move>
+        self.action = action
+        self.update()
+
+        return self.state(level_cleared)
+
+    def update(self) -> None:
+        """
+        Updates all entities in the game field depending on eaches movement
+        """
+        player_start = (self.player.x, self.player.y)
+
+        # Each entity moves at its own <speed>, so only the ones that are due move this tick
+        for entity in [self.player, self.qix] + self.sparx_list:
+            if entity.advance():
+                with PROFILER.section("move", type(entity).__name__):
+                    entity.move(self)
+
+        with PROFILER.section("collide"):
+            self.collide(player_start)
+
+    def collide(self, player_start: tuple) -> None:
+        """
+        Brings <occupancy> up to date with this tick's moves and checks it for collisions. The player loses a life
+        when the Qix touches the wire or when a Sparx touches the player or passes through them on its way from
+        <player_start>.
+        """
+        player = (self.player.x, self.player.y)
+
+        # Sparx that swapped cells with the player passed through them without ever sharing a cell
+        crossed = []
+        for sparx in self.sparx_list:
+            previous = self.occupancy.place(sparx)
+            if player != player_start and previous == player and (sparx.x, sparx.y) == player_start:
+                crossed.append(sparx)
+
+        if self._invulnerable:
+            self._invulnerable -= 1
+            return
+
+        hit_sparx = list(self.occupancy.occupants(player)) + crossed
+        if hit_sparx or (self.qix.x, self.qix.y) in self.occupancy.wire:
+            # Sparx turn around after touching the player
+            for sparx in hit_sparx:
+                sparx.reverse()
+            self.lose_live()
+            self.reset_wire()
+            self._invulnerable = INVULNERABLE_TICKS
+
+    def reset_wire(self) -> None:
+        """
+        Removes the wire and sends the player back to where it started
+        """
+        start = self.map.clear_wire()
+        if start is not None:
+            self.player.x, self.player.y = start
+            self.player.previous_x, self.player.previous_y = start
+
+    def state(self, level_cleared: bool = False) -> dict:
+        """
+        Returns a snapshot of the positions and scores of the game. <level_cleared> is True iff a level was cleared
+        at the start of the tick that produced it.
+        """
+        return {
+            "player": (self.player.x, self.player.y),
+            "qix": (self.qix.x, self.qix.y),
+            "sparx": [(sparx.x, sparx.y) for sparx in self.sparx_list],
+            "wire_length": len(self.map.wire_coordinates),
+            "lives": self._lives,
+            "level": self._difficulty,
+            "captured": self.map.capture_percentage(),
+            "goal": self._goal_percentage,
+            "level_cleared": level_cleared,
+            "game_over": self.game_over(),
+        }
+
+    def checksum(self) -> int:
+        """
+        Returns a CRC-32 of the map, the entity positions and the scores, used to tell whether two games are still in
+        the same state
+        """
+        values = [self.player.x, self.player.y, self.qix.x, self.qix.y, self._lives, self._difficulty,
+                  self._goal_percentage, self._invulnerable]
+        for sparx in self.sparx_list:
+            values += sparx.x, sparx.y
+        return zlib.crc32(repr(values).encode(), self.map.checksum())
+
+    def snapshot(self) -> bytes:
+        """
+        Returns everything needed to carry on the game from this tick in the layout described in snapshot.py, a few
+        kilobytes for the standard map. A game restored from it plays out exactly like this one for the same actions.
+        """
+        map_snapshot = self.map.snapshot()
+        parts = [ENGINE_HEADER.pack(ENGINE_MAGIC, SNAPSHOT_VERSION, self.size, self._difficulty, self._goal_percentage,
+                                    self._lives, self._invulnerable, self.action, len(self.sparx_list),
+                                    len(map_snapshot)),
+                 pack_rng(self.rng), map_snapshot]
+        for entity in [self.player, self.qix] + self.sparx_list:
+            parts.append(struct.pack(entity.STATE_FORMAT, *entity.get_state()))
+        return b"".join(parts)
+
+    def restore(self, snapshot: memoryview) -> None:
+        """
+        Puts the game back in the state saved in <snapshot>, which may be bytes, a memoryview or an mmap, reading it
+        in place. The map and the entities are updated rather than rebuilt. Raises ValueError if <snapshot> is not a
+        snapshot of a game of this size.
+        """
+        view = memoryview(snapshot).cast("B")
+        if len(view) < ENGINE_HEADER.size:
+            raise ValueError("not a game snapshot")
+        (magic, version, size, difficulty, goal, lives, invulnerable, action, sparx_count,
+         map_length) = ENGINE_HEADER.unpack_from(view)
+        if magic != ENGINE_MAGIC:
+            raise ValueError("not a game snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported game snapshot version {version}")
+        if size != self.size:
+            raise ValueError(f"snapshot of a game of size {size} restored onto a game of size {self.size}")
+
+        offset = ENGINE_HEADER.size
+        self.rng.setstate(unpack_rng(view, offset))
+        offset += RNG_STATE.size
+        self.map.restore(view[offset:offset + map_length])
+        offset += map_length
+
+        while len(self.sparx_list) < sparx_count:
+            self.sparx_list.append(Sparx(0, 0, True))
+        del self.sparx_list[sparx_count:]
+        for entity in [self.player, self.qix] + self.sparx_list:
+            entity.set_state(struct.unpack_from(entity.STATE_FORMAT, view, offset))
+            offset += struct.calcsize(entity.STATE_FORMAT)
+
+        self._difficulty = difficulty
+        self._goal_percentage = goal
+        self._lives = lives
+        self._invulnerable = invulnerable
+        self.action = action
+
+        self.occupancy = OccupancyGrid()
+        self.occupancy.sync_wire(self.map.wire_coordinates)
+        for sparx in self.sparx_list:
+            self.occupancy.place(sparx)
+
+    def game_over(self) -> bool:
+        """
+        Returns true iff all lives are lost
+        """
+        return self._lives <= 0
+
+    def level_up(self) -> None:
+        """
+        Increases difficulty and resets level
+        """
+        if self._goal_percentage <= 85:
+            self._goal_percentage += 5
+        self._difficulty += 1
+        self.set_up_level()
+
+    def prepare_level(self) -> None:
+        """
+        Builds the map of the next level ahead of time so setting the level up only has to spawn the entities. The
+        map is copied from a pristine map, which is much faster than building it, and the pristine map is only built
+        here if none was kept yet. Touches nothing the current level uses, so it may run on another thread while the
+        level is played.
+        """
+        if self._pristine is None:
+            self._pristine = Map(self.size)
+        self._next_map = self._pristine.copy()
+
+    def set_up_level(self) -> None:
+        """
+        Sets up each level to its initial state
+        """
+        if self._next_map is not None:
+            self.map = self._next_map
+        elif self._pristine is not None:
+            self.map = self._pristine.copy()
+        else:
+            self.map = Map(self.size)
+        self._next_map = None
+        # Player is always spawned in the middle of the bottom row
+        self.player = Player(self.size // 2, self.size - 1)
+        # Qix is spawned randomly in the uncaptured field
+        x, y = self.map.uncaptured.sample(self.rng)
+        self.qix = Qix(x, y, self.rng)
+
+        # Sparx is spawned randomly along the perimeter
+        self.sparx_list = []
+        for sparx in range(self._difficulty):
+            location = self.rng.choice(self.map.perimeter)
+            if sparx % 2 == 0:
+                self.sparx_list.append(Sparx(location[0], location[1], True))
+            else:
+                self.sparx_list.append(Sparx(location[0], location[1], False))
+
+        # Index where everything starts so collisions can be found by lookup
+        self.occupancy = OccupancyGrid()
+        self.occupancy.sync_wire(self.map.wire_coordinates)
+        for sparx in self.sparx_list:
+            self.occupancy.place(sparx)
+        self._invulnerable = 0
+
+    def lose_live(self) -> None:
+        """
+        Reduces the total number of lives by one
+        """
+        self._lives -= 1
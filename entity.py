@@ -1,4 +1,5 @@
 import pygame
+from assets import load_sprite
 from settings import *
 
 
@@ -9,14 +10,27 @@ class Entity:
     Attributes:
         x (int): x coordinate of the entity on the field
         y (int): y coordinate of the entity on the field
+        previous_x (int): x coordinate before the last move, used to smooth the move out when drawing
+        previous_y (int): y coordinate before the last move, used to smooth the move out when drawing
+        speed (float): cells moved per second, 0 for entities that never move
         screen (pygame.display): Screen that icon is being displayed on
+        STATE_FORMAT (str): struct format of the values returned by get_state, used to write them to a snapshot
     """
     # Private Attributes:
     #   _icon_path (str): Contains icon file path
+    #   _progress (float): movement accumulated towards the next move, a move is due once it reaches TICK_RATE
+
+    # Entities keep their attributes in slots instead of a dictionary, sprites are shared through load_sprite
+    __slots__ = ("x", "y", "previous_x", "previous_y", "_icon_path", "_progress")
 
     x: int
     y: int
-    icon: pygame.Surface
+    previous_x: int
+    previous_y: int
+    speed = 0
+    STATE_FORMAT = "<iiiid"
+    _icon_path: str
+    _progress: float
 
     def __init__(self, x: int, y: int) -> None:
         """
@@ -24,22 +38,70 @@ class Entity:
         """
         self.x = x
         self.y = y
+        self.previous_x, self.previous_y = x, y
+        self._progress = 0
         self.set_icon("resources/sprite_black.png")
 
     def set_icon(self, path: str) -> None:
         """
         Sets <icon> to given file path
         """
-        self.icon = pygame.image.load(path)
+        self._icon_path = path
+
+    @property
+    def icon(self) -> pygame.Surface:
+        """
+        Returns the shared sprite for <_icon_path>, it is only loaded from disk the first time it is drawn
+        """
+        return load_sprite(self._icon_path)
+
+    def advance(self) -> bool:
+        """
+        Accumulates one tick of movement at <speed> and returns true iff the entity is due to move this tick
+        """
+        self._progress += self.speed
+        if self._progress < TICK_RATE:
+            return False
+        self._progress -= TICK_RATE
+        self.previous_x, self.previous_y = self.x, self.y
+        return True
+
+    def get_state(self) -> tuple:
+        """
+        Returns the values that decide where the entity is and how it moves next, in the order of STATE_FORMAT
+        """
+        return self.x, self.y, self.previous_x, self.previous_y, self._progress
+
+    def set_state(self, state: tuple) -> None:
+        """
+        Puts the entity back in the <state> returned by get_state
+        """
+        self.x, self.y, self.previous_x, self.previous_y, self._progress = state
+
+    def position(self, alpha: float) -> tuple:
+        """
+        Returns the x and y coordinates to draw the entity at when <alpha> of the current tick has passed. A move is
+        drawn as a glide from <previous_x> and <previous_y> that lasts until the next move is due, while jumps of more
+        than one cell are drawn straight away.
+        """
+        dx, dy = self.x - self.previous_x, self.y - self.previous_y
+        if not self.speed or not (dx or dy) or max(abs(dx), abs(dy)) > 1:
+            return self.x, self.y
+        fraction = min(1.0, (self._progress + alpha * self.speed) / TICK_RATE)
+        return self.previous_x + dx * fraction, self.previous_y + dy * fraction
+
+    def rect(self, alpha: float = None, offset: tuple = (BORDER, BORDER)) -> pygame.Rect:
+        """
+        Returns the area of the screen the entity covers, at its interpolated position if <alpha> is given. <offset>
+        is the screen position of the top left corner of the field, see Camera.offset.
+        """
+        x, y = (self.x, self.y) if alpha is None else self.position(alpha)
+        return pygame.Rect(round(x * TILE_SIZE) + offset[0], round(y * TILE_SIZE) + offset[1], TILE_SIZE, TILE_SIZE)
 
-    def draw(self, screen: pygame.display) -> None:
+    def draw(self, screen: pygame.display, alpha: float = None, offset: tuple = (BORDER, BORDER)) -> None:
         """
-        Draw the entity at its <x> and <y> coordinates
+        Draw the entity at its <x> and <y> coordinates, or between its previous and current coordinates if <alpha>
+        is given, with the field's top left corner at <offset> on the screen
         """
-        # Set x, y, width and height of the tile rectangle
-        tile = pygame.Rect(self.x * TILE_SIZE + BORDER,
-                           self.y * TILE_SIZE + BORDER,
-                           TILE_SIZE,
-                           TILE_SIZE)
         # Update the icon onto the screen
-        screen.blit(self.icon, tile)
+        screen.blit(self.icon, self.rect(alpha, offset))
@@ -0,0 +1,138 @@
+from collections import deque
+
+
+def flood_fill(matrix: bytearray, size: int, x: int, y: int) -> int:
+    """
+    Fills the region of uncaptured (0) cells containing <x> and <y> in the flat <size> by <size> <matrix> with
+    captured (1) cells and returns the number of cells that were filled.
+
+    Uses a scanline fill driven by an explicit stack, so it never recurses and whole runs of a row are found and
+    filled by bytearray.find and slice assignment instead of one cell at a time.
+    """
+    if not (0 <= x < size and 0 <= y < size) or matrix[y * size + x]:
+        return 0
+
+    filled = 0
+    end_of_matrix = size * size
+    ones = memoryview(b'\x01' * size)
+    stack = [y * size + x]
+    while stack:
+        index = stack.pop()
+        if matrix[index]:
+            continue
+        row = index - index % size
+
+        # Widen the seed to the full run of uncaptured cells on its row
+        left = matrix.rfind(1, row, index)
+        left = row if left == -1 else left + 1
+        right = matrix.find(1, index, row + size)
+        if right == -1:
+            right = row + size
+
+        # A run that is one cell wide is followed up and down the column instead, which keeps vertical corridors
+        # from costing a whole scanline step per cell
+        if right - left == 1:
+            for cell, step in ((index, -size), (index + size, size)):
+                while 0 <= cell < end_of_matrix and not matrix[cell]:
+                    matrix[cell] = 1
+                    filled += 1
+                    if cell % size and not matrix[cell - 1]:
+                        stack.append(cell - 1)
+                    if (cell + 1) % size and not matrix[cell + 1]:
+                        stack.append(cell + 1)
+                    cell += step
+            continue
+
+        matrix[left:right] = ones[:right - left]
+        filled += right - left
+
+        # Seed every run of uncaptured cells directly above and below the filled run
+        for offset in (-size, size):
+            start, end = left + offset, right + offset
+            if start < 0 or end > end_of_matrix:
+                continue
+            seed = matrix.find(0, start, end)
+            while seed != -1:
+                stack.append(seed)
+                wall = matrix.find(1, seed, end)
+                if wall == -1:
+                    break
+                seed = matrix.find(0, wall, end)
+
+    return filled
+
+
+def split_regions(matrix: bytearray, size: int, seeds: list) -> list:
+    """
+    Labels the regions of uncaptured (0) cells in the flat <size> by <size> <matrix> that contain the cell indices
+    in <seeds> and returns the regions that should be captured, each as a list of cell indices.
+
+    Every seed grows its own region breadth first and all regions grow one cell per round, regions that meet are
+    merged. A region grown from several seeds that have not met yet claims several cells per round, so it may finish
+    first and still be the bigger one. Growth therefore stops only once a single region has cells left to explore and
+    it already holds at least as many cells as the largest finished one: it can only get bigger, so it is left
+    uncaptured, and the work done is proportional to the area captured rather than to the whole field. If every
+    region finishes, the largest one is left uncaptured instead.
+    """
+    owner = {}
+    parent = []
+    frontiers = []
+    cells = []
+
+    def find(region: int) -> int:
+        # Follow merged regions up to the region that absorbed them
+        while parent[region] != region:
+            parent[region] = parent[parent[region]]
+            region = parent[region]
+        return region
+
+    for seed in seeds:
+        if not matrix[seed] and seed not in owner:
+            owner[seed] = len(parent)
+            parent.append(len(parent))
+            frontiers.append(deque([seed]))
+            cells.append([seed])
+
+    active = set(range(len(parent)))
+    largest = 0
+    while active:
+        if len(active) == 1 and len(cells[next(iter(active))]) >= largest:
+            break
+        for region in list(active):
+            if region not in active:
+                continue
+            frontier = frontiers[region]
+            if not frontier:
+                active.discard(region)
+                largest = max(largest, len(cells[region]))
+                continue
+
+            index = frontier.popleft()
+            column = index % size
+            for neighbour in (index - 1 if column else -1, index + 1 if column < size - 1 else -1,
+                              index - size, index + size):
+                if neighbour < 0 or neighbour >= size * size or matrix[neighbour]:
+                    continue
+                other = owner.get(neighbour)
+                if other is None:
+                    owner[neighbour] = region
+                    frontier.append(neighbour)
+                    cells[region].append(neighbour)
+                    continue
+
+                # Two regions met, so they are the same region. The smaller one is folded into the bigger one.
+                other = find(other)
+                if other != region:
+                    big, small = (region, other) if len(cells[region]) >= len(cells[other]) else (other, region)
+                    parent[small] = big
+                    frontiers[big].extend(frontiers[small])
+                    cells[big].extend(cells[small])
+                    frontiers[small], cells[small] = None, None
+                    active.discard(small)
+                    region, frontier = big, frontiers[big]
+
+    finished = [cells[region] for region in range(len(parent))
+                if parent[region] == region and region not in active]
+    if not active and finished:
+        finished.remove(max(finished, key=len))
+    return finished
@@ -1,69 +1,67 @@
+import threading
 import pygame
-import random
-from map import Map
-from player import Player
-from qix import Qix
-from sparx import Sparx
+from assets import load_sprite
+from camera import Camera
+from controls import InputQueue
+from engine import Engine
+from hud import Hud
+from profiler import PROFILER
+from renderer import Renderer
+from replay import Recording
 from settings import *
 
 
-class Game:
+# Keys that perform each player action
+ACTION_KEYS = {
+    LEFT: (pygame.K_LEFT, pygame.K_a),
+    RIGHT: (pygame.K_RIGHT, pygame.K_d),
+    UP: (pygame.K_UP, pygame.K_w),
+    DOWN: (pygame.K_DOWN, pygame.K_s),
+    PUSH: (pygame.K_SPACE,),
+}
+KEY_ACTIONS = {key: flag for flag, keys in ACTION_KEYS.items() for key in keys}
+
+
+class Game(Engine):
     """
-    The is class handles all of the Pygame modules and game rules
+    The is class handles all of the Pygame modules on top of the game rules simulated by <Engine>
 
     Attributes:
         screen (Pygame): Pygame module displayed screen
         clock (Pygame): Pygame module that sets game frame rate
-        key_pressed (Pygame): current key that is being pressed
-        map (Map): a Map object containing all of the field information
-        player (Player): instance of the player in the game
-        sparx_list (list): list of all sparx objects
-        qix (Qix): entity that roams around the uncaptured territory
-        slow_movement(bool): player moves twice as fast as other entities
+        renderer (Renderer): redraws the parts of <screen> that changed each frame
+        hud (Hud): the interface along the bottom of <screen>
+        controls (InputQueue): turns the key presses and releases between ticks into the action of every tick
+        recording (Recording): records the action of every tick, or None when the game is not being recorded
     """
     # Private Attibutes:
     #   _playing (bool): True iff the game is playing
-    #   _goal_percentage(int): Goal of captured field in current game
-    #   _difficulty: the difficulty of the stage
-    #   _lives (int): player total lives
+    #   _preparing (threading.Thread): worker copying the map of the next level, or None before the first level
 
     screen: pygame
     clock: pygame
-    key_pressed: pygame
-    map: Map
-    player: Player
-    sparx_list: list
-    qix: Qix
-    slow_movement: bool
+    renderer: Renderer
+    hud: Hud
+    controls: InputQueue
+    recording: Recording
     _playing: bool
-    _goal_percentage: int
-    _difficulty: int
-    _lives: int
+    _preparing: threading.Thread
 
-    def __init__(self, size: int, difficulty: int, screen) -> None:
+    def __init__(self, size: int, difficulty: int, screen, seed: int = None, recording: Recording = None) -> None:
         """
-        Initialize game by setting the field map to <size> and creating the starting level
+        Initialize game by setting the field map to <size> and creating the starting level. Every tick is added to
+        <recording> if one is given, in which case the game is played with its seed instead of <seed>.
         """
         # Set screen, frame rate, and current key pressed
         self.screen = screen
         self.clock = pygame.time.Clock()
-        self.key_pressed = None
-
-        # Set starting <goal> percentage and difficulty
-        self._goal_percentage = 60
-        self._difficulty = difficulty
-
-        # Set all entity attributes
-        self.sparx_list = []
-        self.size = size
-        self.qix = None
-        self.map = None
-        self.slow_movement = True
+        self.renderer = Renderer(screen)
+        self.controls = InputQueue()
+        self.recording = recording
+        self._preparing = None
 
-        self._lives = 3
-
-        # Creates the initial state of a level
-        self.set_up_level()
+        super().__init__(size, difficulty, seed if recording is None else recording.seed)
+        self.hud = Hud(screen, VIEW_SIZE * TILE_SIZE + BORDER * 2)
 
         self._playing = False
 
@@ -73,118 +71,135 @@ class Game:
         """
         self._playing = True
 
+        # The simulation runs in fixed ticks of <tick_length> milliseconds however fast frames are drawn
+        tick_length = 1000 / TICK_RATE
+        lag = 0
+
         while self._playing:
-            # Set clock tick rate
-            self.clock.tick(7)
-            for event in pygame.event.get():
-                # Check if game window is closed
-                if event.type == pygame.QUIT:
-                    self._playing = False
-            # Game over if all lives are lost
-            if self._lives <= 0:
-                self._playing = False
-
-            # Check if minimum goal percentage is met
-            if self._goal_percentage <= self.map.capture_percentage():
-                # Displays congrats message
-                self.screen.blit(pygame.image.load("resources/congratulations.png"), pygame.Rect(207, 282, 250, 100))
-                pygame.display.update()
-                pygame.time.wait(300)
-
-                # Increases difficulty and resets level
-                if self._goal_percentage <= 85:
-                    self._goal_percentage += 5
-                self._difficulty += 1
-                self.set_up_level()
-
-            # Update all entity movement according to their specific <move> and redraw them onto <screen>
-            self.update()
-            self.draw_background()
-            self.draw_entity()
-
-            pygame.display.update()
+            # Set frame rate
+            with PROFILER.section("wait"):
+                lag = min(lag + self.clock.tick(FPS), tick_length * MAX_TICKS_PER_FRAME)
+
+            with PROFILER.section("frame"):
+                with PROFILER.section("input"):
+                    for event in pygame.event.get():
+                        self.handle_event(event)
+
+                # Run every tick that is due
+                while lag >= tick_length and self._playing:
+                    lag -= tick_length
+                    # Update all entity movement according to their specific <move>
+                    with PROFILER.section("input"):
+                        action = self.read_action()
+                    with PROFILER.section("update"):
+                        state = self.step(action)
+                    if self.recording is not None:
+                        self.recording.record(self, action)
+
+                    # Game over if all lives are lost
+                    if state["game_over"]:
+                        self._playing = False
+
+                    if state["level_cleared"]:
+                        # Displays congrats message over the last frame and gives time before the next level begins
+                        self.screen.blit(load_sprite("resources/congratulations.png"),
+                                         pygame.Rect(207, 282, 250, 100))
+                        pygame.display.update()
+                        self.pause(1300)
+                        self.renderer.invalidate()
+                        self.clock.tick()
+                        lag = 0
+
+                # Redraw everything that changed onto <screen>, with entities part way between ticks
+                with PROFILER.section("draw"):
+                    rects = self.renderer.draw(self, lag / tick_length)
+                    if PROFILER.overlay:
+                        rects.append(PROFILER.draw_overlay(self.screen))
+                with PROFILER.section("flip"):
+                    pygame.display.update(rects)
         pygame.quit()
 
-    def update(self) -> None:
+    def pause(self, milliseconds: int) -> None:
         """
-        Updates all entities in the game field depending on eaches movement
+        Waits for <milliseconds> while still handling window events, so the window stays responsive and can be closed
         """
-        self.key_pressed = pygame.key.get_pressed()
-        self.player.move(self)
+        end = pygame.time.get_ticks() + milliseconds
+        while self._playing and pygame.time.get_ticks() < end:
+            for event in pygame.event.get():
+                self.handle_event(event)
+            self.clock.tick(FPS)
 
-        # Non-player entities move twice as slow as <player>
-        if self.slow_movement:
-            self.qix.move(self)
-            for sparx in self.sparx_list:
-                sparx.move(self)
-            self.slow_movement = False
-        else:
-            self.slow_movement = True
+    def set_up_level(self) -> None:
+        """
+        Sets up each level with the map prepared in the background, then starts preparing the map of the next one
+        while this level is played
+        """
+        if self._preparing is not None:
+            self._preparing.join()
+        super().set_up_level()
+        # The first level's map is still untouched here, so the worker only has to copy it instead of building one
+        if self._pristine is None:
+            self._pristine = self.map.copy()
+        self._preparing = threading.Thread(target=self.prepare_level, daemon=True)
+        self._preparing.start()
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """
+        Acts on a window <event>. Key presses are queued in <controls> with the time they were read, pygame does not
+        report when they happened.
+        """
+        # Check if game window is closed
+        if event.type == pygame.QUIT:
+            self._playing = False
+        elif event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+            self.controls.press(KEY_ACTIONS[event.key])
+        elif event.type == pygame.KEYUP and event.key in KEY_ACTIONS:
+            self.controls.release(KEY_ACTIONS[event.key])
+        # Keys released while the window is not focused are never reported
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.controls.clear()
+        # Toggle the profiler overlay
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and PROFILER.enabled:
+            PROFILER.overlay = not PROFILER.overlay
+            self.renderer.invalidate()
+
+    def read_action(self) -> int:
+        """
+        Returns the player action of the tick about to run, see InputQueue.next_action
+        """
+        return self.controls.next_action()
 
     def draw_background(self) -> None:
         """
         Draws background of game onto <screen>
         """
-        pixel_font = pygame.font.Font("resources/game_font.ttf", 40)
-
         # Sets background
-        self.screen.blit(pygame.image.load("resources/background.png"), pygame.Rect(0, 0, WIDTH, HEIGHT))
+        self.screen.blit(load_sprite("resources/background.png"), pygame.Rect(0, 0, WIDTH, HEIGHT))
 
         # Sets interface along the bottom of <screen>
+        self.draw_interface()
 
-        # Lives count
-        self.screen.blit(pygame.image.load("resources/sprite_player.png"), pygame.Rect(72, 665, 24, 24))
-        self.screen.blit(pixel_font.render('x', False,  (238, 236, 222)),(96, 658))
-        self.screen.blit(pixel_font.render(str(self._lives), False, (238, 236, 222)), (116, 658))
-
-        # Current level
-        self.screen.blit(pixel_font.render('Level:', False, (238, 236, 222)), (169, 658))
-        self.screen.blit(pixel_font.render(str(self._difficulty), False, (238, 236, 222)), (249, 658))
-
-        # Current capture percentage
-        self.screen.blit(pixel_font.render('Current:', False, (238, 236, 222)), (303, 658))
-        self.screen.blit(pixel_font.render(str(self.map.capture_percentage()) + '%', False, (238, 236, 222)), (413, 658))
-
-        # Goal percentage of the level
-        self.screen.blit(pixel_font.render('Goal:', False, (238, 236, 222)), (496, 658))
-        self.screen.blit(pixel_font.render(str(self._goal_percentage) + '%', False, (238, 236, 222)), (561, 658))
-
-    def draw_entity(self) -> None:
+    def interface_values(self) -> tuple:
         """
-        Draws all entities onto <screen>
+        Returns the values shown on the interface, the interface only has to be redrawn when they change
         """
-        self.map.draw(self.screen)
-        self.qix.draw(self.screen)
-        self.player.draw(self.screen)
+        return self._lives, self._difficulty, self.map.capture_percentage(), self._goal_percentage
 
-        for sparx in self.sparx_list:
-            sparx.draw(self.screen)
-
-    def set_up_level(self) -> None:
+    def draw_interface(self) -> pygame.Rect:
         """
-        Sets up each level to its initial state
+        Draws the interface along the bottom of <screen> and returns the area it covers
         """
-        # Gives times before the level begins
-        if self._difficulty != 1:
-            pygame.time.wait(1000)
-
-        self.map = Map(self.size)
-        # Player is always spawned in the middle of the bottom row
-        self.player = Player(12, 24)
-        # Qix is spawned randomly in the uncaptured field
-        self.qix = Qix(random.randrange(1, 24), random.randrange(1, 24))
+        return self.hud.draw(*self.interface_values())
 
-        # Sparx is spawned randomly along the perimeter
-        self.sparx_list = []
-        for sparx in range(self._difficulty):
-            location = random.choice(self.map.perimeter)
-            if sparx % 2 == 0:
-                self.sparx_list.append(Sparx(location[0], location[1], True))
-            else:
-                self.sparx_list.append(Sparx(location[0], location[1], False))
-
-    def lose_live(self) -> None:
+    def draw_entity(self, alpha: float = None, camera: Camera = None) -> None:
         """
-        Reduces the total number of lives by one
+        Draws all entities onto <screen>, <alpha> of the way into the current tick. Only the part of the field seen
+        by <camera> is drawn if one is given.
         """
-        self._lives -= 1
+        offset = (BORDER, BORDER) if camera is None else camera.offset
+        self.map.draw(self.screen, camera)
+        self.qix.draw(self.screen, alpha, offset)
+        self.player.draw(self.screen, alpha, offset)
+
+        for sparx in self.sparx_list:
+            sparx.draw(self.screen, alpha, offset)
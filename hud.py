@@ -0,0 +1,63 @@
+import pygame
+from assets import load_sprite
+from settings import *
+
+
+HUD_COLOUR = (238, 236, 222)
+
+# Position of every static label and of every value shown on the interface
+LABELS = (("x", (96, 658)), ("Level:", (169, 658)), ("Current:", (303, 658)), ("Goal:", (496, 658)))
+VALUE_POSITIONS = ((116, 658), (249, 658), (413, 658), (561, 658))
+
+
+class Hud:
+    """
+    The interface along the bottom of the screen showing lives, level, capture percentage and goal. The font is
+    loaded and the labels are rendered once, a value is only rendered again when it changes.
+
+    Attributes:
+        screen (pygame.Surface): Screen that the interface is drawn on
+        area (pygame.Rect): the area below the field that the interface covers
+    """
+    # Private Attributes:
+    #   _font (pygame.font.Font): font of all text on the interface
+    #   _labels (list): rendered static labels along with their positions
+    #   _values (list): the value shown in each slot of the interface, or None if it was never rendered
+    #   _value_surfaces (list): rendered text of each value in <_values>
+
+    screen: pygame.Surface
+    area: pygame.Rect
+    _font: pygame.font.Font
+    _labels: list
+    _values: list
+    _value_surfaces: list
+
+    def __init__(self, screen: pygame.Surface, top: int) -> None:
+        """
+        Initialize the interface on <screen> covering everything below the row <top>
+        """
+        self.screen = screen
+        self.area = pygame.Rect(0, top, WIDTH, HEIGHT - top)
+        self._font = pygame.font.Font("resources/game_font.ttf", 40)
+        self._labels = [(self._font.render(text, False, HUD_COLOUR), position) for text, position in LABELS]
+        self._values = [None] * len(VALUE_POSITIONS)
+        self._value_surfaces = [None] * len(VALUE_POSITIONS)
+
+    def draw(self, lives: int, level: int, captured: int, goal: int) -> pygame.Rect:
+        """
+        Draws the interface showing <lives>, <level>, <captured> percentage and <goal> percentage and returns the area
+        it covers
+        """
+        # Clears the previous values by restoring the background below the field
+        self.screen.blit(load_sprite("resources/background.png"), self.area, self.area)
+        self.screen.blit(load_sprite("resources/sprite_player.png"), pygame.Rect(72, 665, 24, 24))
+        for surface, position in self._labels:
+            self.screen.blit(surface, position)
+
+        for i, text in enumerate((str(lives), str(level), f"{captured}%", f"{goal}%")):
+            if text != self._values[i]:
+                self._values[i] = text
+                self._value_surfaces[i] = self._font.render(text, False, HUD_COLOUR)
+            self.screen.blit(self._value_surfaces[i], VALUE_POSITIONS[i])
+
+        return self.area
@@ -1,16 +1,59 @@
+import argparse
+import random
+import sys
+
 import pygame
 
 from game import Game
+from profiler import PROFILER
+from replay import Recording, parse_seed, replay
 from settings import *
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Qix")
+    parser.add_argument("--size", type=int, default=GRIDSIZE, help="length of the square field in cells")
+    parser.add_argument("--seed", type=parse_seed, default=None, help="seed of the game, random by default")
+    parser.add_argument("--record", metavar="PATH", help="save the seed and every input of the game to PATH")
+    parser.add_argument("--replay", metavar="PATH", help="replay the recording at PATH headless at full speed")
+    parser.add_argument("--checksum-every", type=int, default=50, help="ticks between checksums in a recording")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every frame phase and print a summary at exit, F3 toggles the overlay")
+    parser.add_argument("--trace", metavar="PATH", help="save the frame timings to PATH as a Chrome trace")
+    parser.add_argument("--profile-csv", metavar="PATH", help="save the frame timings to PATH as CSV")
+    args = parser.parse_args()
+
+    if args.replay:
+        result = replay(Recording.load(args.replay))
+        print(f"{result['ticks']} ticks in {result['seconds']:.3f}s ({result['ticks_per_second']:.0f} ticks/s)")
+        if result["diverged_at"] is not None:
+            print(f"diverged from the recording at tick {result['diverged_at']}")
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.profile or args.trace or args.profile_csv:
+        PROFILER.enable(overlay=args.profile)
+
+    recording = None
+    if args.record:
+        seed = random.randrange(2 ** 32) if args.seed is None else args.seed
+        recording = Recording(args.size, 1, seed, args.checksum_every)
+
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption(TITLE)
     pygame.display.set_icon(pygame.image.load("resources/logo_qix.png"))
-    qix = Game(GRIDSIZE, 1, screen)
+    qix = Game(args.size, 1, screen, args.seed, recording)
     qix.run()
 
+    if recording is not None:
+        recording.save(args.record)
+    if args.trace:
+        PROFILER.export_trace(args.trace)
+    if args.profile_csv:
+        PROFILER.export_csv(args.profile_csv)
+    if PROFILER.enabled:
+        print(PROFILER.summary(), file=sys.stderr)
+
 username = input("Enter username:")
 print("Username is: " + username)
\ No newline at end of file
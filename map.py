@@ -1,27 +1,64 @@
+import zlib
+from array import array
 import pygame
-import math
-from tile import Tile
-from wire import Wire
+from cellset import CellSet, GridCells
+from flood import flood_fill, split_regions
+from profiler import PROFILER
+from snapshot import (CELL_SIZE, MAP_HEADER, MAP_MAGIC, SNAPSHOT_VERSION, pack_bits, pack_cells, padded_length,
+                      unpack_bits, unpack_cells)
+from assets import load_sprite
+from tile import TILE_SPRITES, Tile
 from settings import *
 
 
+# Sprite drawn over every cell of the wire
+WIRE_SPRITE = "resources/sprite_wire.png"
+
+# Directions of travel in clockwise order on the screen: right, down, left and up
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+# Order in which turns are tried when following the perimeter, relative to the current direction. Clockwise
+# travellers keep the uncaptured field on their right so they prefer turning right, counter-clockwise ones left.
+TURN_ORDER = {True: (1, 0, 3, 2), False: (3, 0, 1, 2)}
+
+# TURNS[clockwise][links][direction] is the direction taken next from a perimeter cell whose adjacent perimeter
+# cells are the <links> bitmask (bit i set iff the cell in DIRECTIONS[i] is on the perimeter), or -1 if there is none
+TURNS = {clockwise: [[next((direction + turn) % 4 for turn in order if links >> ((direction + turn) % 4) & 1)
+                      if links else -1 for direction in range(4)] for links in range(16)]
+         for clockwise, order in TURN_ORDER.items()}
+
+
 class Map:
     """
     A class that handles map functionality
 
     Attributes:
         size(int): the length of the square map
-        tiles(list(list)): matrix of the tiles
-        perimeter list(tuples)): contains the coordinates of the captured perimeter
-        wires List(wire): list of wire entities
-        wire_coordinates list(tuples): list wire coordinates
+        grid(bytearray): captured status of every cell stored row by row, 1 iff the cell is captured. Cells are not
+            kept as Tile objects, see tile
+        captured_count(int): number of captured cells in <grid>
+        uncaptured (GridCells): every uncaptured cell, read from <grid> and used to pick one at random
+        perimeter (CellSet): contains the coordinates of the captured perimeter
+        perimeter_links (dict): bitmask of the adjacent perimeter cells of every perimeter cell, see <TURNS>
+        wire_coordinates (CellSet): cells of the wire in the order they were drawn
+        dirty set(tuples): coordinates of cells that changed since they were last drawn, only kept while <tracking>
+        tracking (bool): True iff changed cells are added to <dirty>, turned on by whatever reads and clears it, so a
+            headless map does not keep every cell it ever changed
+        surface (pygame.Surface): the whole field drawn off screen and patched as cells change, None until the field
+            is first drawn or when the field is bigger than MAX_BAKED_SIZE
     """
 
     size: int
-    tiles: list
-    perimeter: list
-    wires: list
-    wire_coordinates: list
+    grid: bytearray
+    captured_count: int
+    uncaptured: GridCells
+    perimeter: CellSet
+    perimeter_links: dict
+    wire_coordinates: CellSet
+    dirty: set
+    tracking: bool
+    surface: pygame.Surface
 
     def __init__(self, size: int) -> None:
         """
@@ -30,163 +67,386 @@ class Map:
         """
         # Initialize class attributes
         self.size = size
-        self.tiles = []
-        self.perimeter = []
-        self.wires = []
-        self.wire_coordinates = []
-
-        # Populate <tiles> attribute with tile objects
-        for y in range(size):
-            row = []
-            for x in range(size):
-                row.append(Tile(x, y))
-            self.tiles.append(row)
+        self.grid = bytearray(size * size)
+        self.captured_count = 0
+        self.uncaptured = GridCells(self.grid, size)
+        self.perimeter = CellSet()
+        self.perimeter_links = {}
+        self.wire_coordinates = CellSet()
+        self.dirty = set()
+        self.tracking = False
+        self.surface = None
 
         # Set edges of tiles to be captured and include them into the initial perimeter
-        for i in range(self.size):
-            self.tiles[i][0].capture()
-        for i in range(1, self.size - 1):
-            self.tiles[self.size - 1][i].capture()
-        for i in range(self.size - 1, -1, -1):
-            self.tiles[i][self.size - 1].capture()
-        for i in range(self.size - 2, 0, -1):
-            self.tiles[0][i].capture()
+        for x, y in self.border():
+            self.capture(x, y)
+
+        self._init_border_perimeter()
+
+    def copy(self) -> 'Map':
+        """
+        Returns an independent map in the same state, with the same cell orders so it plays out the same. Much faster
+        than building a map from scratch since no perimeter is searched for.
+        """
+        clone = Map.__new__(Map)
+        clone.size = self.size
+        clone.grid = bytearray(self.grid)
+        clone.captured_count = self.captured_count
+        clone.uncaptured = self.uncaptured.copy(clone.grid)
+        clone.perimeter = CellSet(self.perimeter)
+        clone.perimeter_links = dict(self.perimeter_links)
+        clone.wire_coordinates = CellSet(self.wire_coordinates)
+        clone.dirty = set()
+        clone.tracking = False
+        clone.surface = None
+        return clone
 
-        self.get_perimeter()
+    def tile(self, x: int, y: int) -> Tile:
+        """
+        Returns a Tile showing the cell at <x> and <y>. The Tile is made on demand and reads and changes the cell in
+        this map.
+        """
+        return Tile(self, x, y)
 
     def push(self, x: int, y: int) -> None:
         """
         Builds wire along the players path while they are travelling the uncaptured territory
         """
-        # Disregards invalid inputs and updates <wire> and <wire_coordinates> accordingly
+        # Disregards invalid inputs and updates <wire_coordinates> accordingly
         if (x, y) not in self.wire_coordinates:
-            self.wires.append(Wire(x, y))
-            self.wire_coordinates.append((x, y))
+            self.wire_coordinates.add((x, y))
+            if self.tracking:
+                self.dirty.add((x, y))
+            self._patch(x, y)
+
+    def draw(self, screen: pygame.display, camera: 'Camera' = None) -> None:
+        """
+        Draws the tiles and the wire onto <screen> with their updated captured status. Only the part of the field seen
+        by <camera> is drawn if one is given. Fields up to MAX_BAKED_SIZE are drawn from <surface> with one blit,
+        bigger ones tile by tile so the cost depends on the size of the view rather than of the map.
+        """
+        if self.surface is None and self.size <= MAX_BAKED_SIZE:
+            self._bake()
+
+        if self.surface is not None:
+            if camera is None:
+                screen.blit(self.surface, (BORDER, BORDER))
+            else:
+                screen.blit(self.surface, camera.view.topleft,
+                            pygame.Rect(camera.x, camera.y, camera.view.width, camera.view.height))
+            return
+
+        if camera is None:
+            columns = rows = range(self.size)
+            offset = (BORDER, BORDER)
+        else:
+            columns, rows = camera.visible_cells()
+            offset = camera.offset
+
+        # Draws all visible field tiles onto screen along with the wire crossing them. The wire is looked up per
+        # visible cell so the cost depends on the size of the view rather than on the length of the wire.
+        for y in rows:
+            for x in columns:
+                self._draw_sprites(screen, x, y, offset)
+
+    def draw_cell(self, screen: pygame.display, x: int, y: int, offset: tuple = (BORDER, BORDER)) -> None:
+        """
+        Draws only the tile at <x> and <y> onto <screen>, along with the wire crossing it if there is one, with the
+        field's top left corner at <offset>
+        """
+        if self.surface is not None:
+            screen.blit(self.surface, (x * TILE_SIZE + offset[0], y * TILE_SIZE + offset[1]),
+                        pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+        else:
+            self._draw_sprites(screen, x, y, offset)
+
+    def _draw_sprites(self, screen: pygame.Surface, x: int, y: int, offset: tuple) -> None:
+        """
+        Draws the sprites of the tile at <x> and <y> and of the wire crossing it onto <screen>
+        """
+        self._draw_tile(screen, x, y, offset)
+        if (x, y) in self.wire_coordinates:
+            self._draw_wire(screen, x, y, offset)
+
+    def _draw_tile(self, screen: pygame.Surface, x: int, y: int, offset: tuple) -> None:
+        """
+        Draws the sprite of the tile at <x> and <y> for its captured status onto <screen>
+        """
+        screen.blit(load_sprite(TILE_SPRITES[self.grid[y * self.size + x]]),
+                    (x * TILE_SIZE + offset[0], y * TILE_SIZE + offset[1]))
+
+    def _draw_wire(self, screen: pygame.Surface, x: int, y: int, offset: tuple) -> None:
+        """
+        Draws the wire sprite over the cell at <x> and <y> onto <screen>
+        """
+        screen.blit(load_sprite(WIRE_SPRITE), (x * TILE_SIZE + offset[0], y * TILE_SIZE + offset[1]))
+
+    def _bake(self) -> None:
+        """
+        Draws the whole field onto a new <surface>
+        """
+        self.surface = pygame.Surface((self.size * TILE_SIZE, self.size * TILE_SIZE))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        for y in range(self.size):
+            for x in range(self.size):
+                self._draw_tile(self.surface, x, y, (0, 0))
+        for x, y in self.wire_coordinates:
+            self._draw_wire(self.surface, x, y, (0, 0))
+
+    def _patch(self, x: int, y: int) -> None:
+        """
+        Redraws the cell at <x> and <y> onto <surface> after it changed, if the field has been baked
+        """
+        if self.surface is not None:
+            self._draw_sprites(self.surface, x, y, (0, 0))
 
-    def draw(self, screen: pygame.display) -> None:
+    def capture(self, x: int, y: int) -> None:
         """
-        Draws <tiles> and <wires> onto <screen> with their updated captured status
+        Captures the Tile at <x> and <y>, keeping <grid> and <captured_count> up to date
         """
-        # Draws all field tiles onto screen
-        for row in self.tiles:
-            for tile in row:
-                tile.draw(screen)
-        # Draws all wires onto screen
-        for wire in self.wires:
-            wire.draw(screen)
+        index = y * self.size + x
+        if not self.grid[index]:
+            self.grid[index] = 1
+            self.captured_count += 1
+            self.uncaptured.discard((x, y))
+            if self.tracking:
+                self.dirty.add((x, y))
+            self._patch(x, y)
 
     def capture_percentage(self) -> int:
         """
         Returns current capture percentage of the field as a percentage of captured / total.
         """
-        # Sum of all captured tiles
-        total = 0
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.is_captured(i, j):
-                    total += 1
-
         # Current captured percentage rounded down to the nearest ones
-        return math.floor((total / self.size ** 2) * 100)
+        return self.captured_count * 100 // self.size ** 2
+
+    def checksum(self) -> int:
+        """
+        Returns a CRC-32 of the captured cells and the wire, equal for any two maps in the same state
+        """
+        return zlib.crc32(repr(list(self.wire_coordinates)).encode(), zlib.crc32(self.grid))
+
+    def snapshot(self) -> bytes:
+        """
+        Returns the captured cells, perimeter and wire of the map in the layout described in snapshot.py. A snapshot
+        takes an eighth of a byte per cell plus four bytes per perimeter and wire cell. The uncaptured cells follow
+        from the captured ones and are not stored.
+        """
+        size = self.size
+        perimeter = array("I", (y * size + x for x, y in self.perimeter))
+        wire = array("I", (y * size + x for x, y in self.wire_coordinates))
+        return b"".join((MAP_HEADER.pack(MAP_MAGIC, SNAPSHOT_VERSION, size, len(perimeter), len(wire)),
+                         pack_bits(self.grid), pack_cells(perimeter), pack_cells(wire)))
+
+    def restore(self, snapshot: memoryview) -> None:
+        """
+        Puts the map back in the state saved in <snapshot>, which may be bytes, a memoryview or an mmap. The cell
+        arrays are read in place and only the cells that differ from the current state are redrawn, so restoring a
+        recent snapshot of the same game is cheap. Raises ValueError if <snapshot> is not a snapshot of a map of
+        this size.
+        """
+        view = memoryview(snapshot).cast("B")
+        if len(view) < MAP_HEADER.size:
+            raise ValueError("not a map snapshot")
+        magic, version, size, perimeter_count, wire_count = MAP_HEADER.unpack_from(view)
+        if magic != MAP_MAGIC:
+            raise ValueError("not a map snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported map snapshot version {version}")
+        if size != self.size:
+            raise ValueError(f"snapshot of a map of size {size} restored onto a map of size {self.size}")
+
+        offset = MAP_HEADER.size
+        grid = unpack_bits(view[offset:offset + padded_length(size * size)], size * size)
+        offset += padded_length(size * size)
+        perimeter = unpack_cells(view, offset, perimeter_count, "I")
+        offset += perimeter_count * CELL_SIZE
+        wire = unpack_cells(view, offset, wire_count, "I")
+
+        # Only rows that differ are compared cell by cell
+        changed = set()
+        for y in range(size):
+            start = y * size
+            if self.grid[start:start + size] != grid[start:start + size]:
+                for x in range(size):
+                    if self.grid[start + x] != grid[start + x]:
+                        changed.add((x, y))
+        self.grid[:] = grid
+        self.captured_count = grid.count(1)
+        self.uncaptured.recount()
+
+        self.perimeter = CellSet((index % size, index // size) for index in perimeter)
+        self.perimeter_links = {}
+        for x, y in self.perimeter:
+            links = 0
+            for bit, (i, j) in enumerate(DIRECTIONS):
+                if (x + i, y + j) in self.perimeter:
+                    links |= 1 << bit
+            self.perimeter_links[(x, y)] = links
+
+        # The wire is refilled rather than replaced since the OccupancyGrid shares it
+        changed.update(self.wire_coordinates)
+        self.wire_coordinates.clear()
+        for index in wire:
+            self.wire_coordinates.add((index % size, index // size))
+        changed.update(self.wire_coordinates)
+        for x, y in changed:
+            self._patch(x, y)
+        if self.tracking:
+            self.dirty.update(changed)
 
     def is_captured(self, x: int, y: int) -> bool:
         """
         Returns true iff Tile at <x> and <y> coordinate is captured
         """
         # Disregard invalid input and returns their respective captured status
-        if x in range(self.size) and y in range(self.size):
-            return self.tiles[y][x].captured
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return self.grid[y * self.size + x] == 1
         return True
 
-    def get_perimeter(self) -> None:
+    def border(self) -> list:
         """
-        Updates <perimeter> tuples with new coordinates of captured tiles that are adjacent to uncaptured tiles
+        Returns the cells along the edges of the map in order around it: down the left edge, along the bottom edge,
+        up the right edge and back along the top edge
         """
-        self.perimeter = []
-        # Iterate through matrix
-        for y in range(self.size):
-            for x in range(self.size):
-                # Check if current tile is captured
-                if self.is_captured(x, y):
-                    # Coordinates of adjacent tiles
-                    for i in range(-1, 2):
-                        for j in range(-1, 2):
-                            # Checks if adjacent tiles are uncaptured
-                            if not self.is_captured(x + i, y + j) and (x, y) not in self.perimeter:
-                                self.perimeter.append((x, y))
-                                break
+        last = self.size - 1
+        return ([(0, i) for i in range(self.size)] + [(i, last) for i in range(1, last)] +
+                [(last, i) for i in range(last, -1, -1)] + [(i, 0) for i in range(last - 1, 0, -1)])
+
+    def _init_border_perimeter(self) -> None:
+        """
+        Sets <perimeter> and <perimeter_links> to those of a new map, whose perimeter is its border, so it is only
+        called while the map is built and would be wrong for a map in play. The cells are kept in the order of border
+        so Sparx spawn on the same cells for the same seed, and each is linked to the two cells next to it around the
+        border. Only the border is visited, not the whole field.
+        """
+        with PROFILER.section("border_perimeter"):
+            ring = self.border()
+            self.perimeter = CellSet(ring)
+            self.perimeter_links = {}
+            for x, y in ring:
+                links = 0
+                for bit, (i, j) in enumerate(DIRECTIONS):
+                    if (x + i, y + j) in self.perimeter:
+                        links |= 1 << bit
+                self.perimeter_links[(x, y)] = links
+
+    def update_perimeter(self, cells: iter) -> None:
+        """
+        Updates <perimeter> and <perimeter_links> after the given <cells> changed. Only those cells and the cells
+        surrounding them can join or leave the perimeter, so the rest of the field is left untouched.
+        """
+        # Changed cells along with their adjacent tiles, kept in a dict so cells join the perimeter in the order they
+        # are found rather than in the iteration order of a set
+        candidates = {}
+        for x, y in cells:
+            for i in range(-1, 2):
+                for j in range(-1, 2):
+                    if 0 <= x + i < self.size and 0 <= y + j < self.size:
+                        candidates[(x + i, y + j)] = None
+
+        for x, y in candidates:
+            if self._on_perimeter(x, y):
+                self.perimeter.add((x, y))
+            else:
+                self.perimeter.discard((x, y))
+
+        # Cells next to a cell that joined or left the perimeter have new links
+        linked = dict(candidates)
+        for x, y in candidates:
+            for i, j in DIRECTIONS:
+                linked[(x + i, y + j)] = None
+        for x, y in linked:
+            if (x, y) in self.perimeter:
+                links = 0
+                for bit, (i, j) in enumerate(DIRECTIONS):
+                    if (x + i, y + j) in self.perimeter:
+                        links |= 1 << bit
+                self.perimeter_links[(x, y)] = links
+            else:
+                self.perimeter_links.pop((x, y), None)
+
+    def next_direction(self, x: int, y: int, direction: tuple, clockwise: bool) -> tuple:
+        """
+        Returns the direction to take from the perimeter cell at <x> and <y> when travelling in <direction> around
+        the perimeter, or (0, 0) if the cell has no adjacent perimeter cell
+        """
+        turn = TURNS[clockwise][self.perimeter_links.get((x, y), 0)][DIRECTION_INDEX.get(direction, 0)]
+        return DIRECTIONS[turn] if turn != -1 else (0, 0)
+
+    def start_direction(self, x: int, y: int, clockwise: bool) -> tuple:
+        """
+        Returns a direction from the perimeter cell at <x> and <y> that travels clockwise or counter-clockwise around
+        the uncaptured field, that is the field is on the right or left of the returned direction respectively
+        """
+        links = self.perimeter_links.get((x, y), 0)
+        for i, (dx, dy) in enumerate(DIRECTIONS):
+            if links >> i & 1:
+                # The side of the direction the field has to be on
+                sx, sy = (-dy, dx) if clockwise else (dy, -dx)
+                if not self.is_captured(x + sx, y + sy) or not self.is_captured(x + dx + sx, y + dy + sy):
+                    return dx, dy
+        return self.next_direction(x, y, (1, 0), clockwise)
+
+    def _on_perimeter(self, x: int, y: int) -> bool:
+        """
+        Returns true iff the tile at <x> and <y> is captured and adjacent to an uncaptured tile
+        """
+        if not self.is_captured(x, y):
+            return False
+        for i in range(-1, 2):
+            for j in range(-1, 2):
+                if not self.is_captured(x + i, y + j):
+                    return True
+        return False
 
     def capture_field(self) -> None:
         """
-        Decides and captures the field with the smallest percentage. Updates <tiles> with each specific tiles
+        Decides and captures the field with the smallest percentage. Updates <grid> with each specific tiles
         <captured> status
         """
         # Sets all tiles along the wire to captured
-        for wire in self.wires:
-            self.tiles[wire.y][wire.x].capture()
-
-        # Orientation of wire when leaving <perimeter>
-        direction = (self.wires[0].x - self.wires[1].x, self.wires[0].y - self.wires[1].y)
-
-        # Boolean matrix of <tiles> with each tiles respective captured status for faster performance
-        temp_tiles_left = [[False for x in range(self.size)] for x in range(self.size)]
-        temp_tiles_right = [[False for x in range(self.size)] for x in range(self.size)]
-        for i in range(self.size):
-            for j in range(self.size):
-                temp_tiles_left[j][i] = self.is_captured(i, j)
-                temp_tiles_right[j][i] = self.is_captured(i, j)
-
-        # Flood fill both matrices from two different starting points
-        if direction[0]:
-            self.flood_fill(temp_tiles_left, self.wires[1].x, self.wires[1].y + 1)
-            self.flood_fill(temp_tiles_right, self.wires[1].x, self.wires[1].y - 1)
-        else:
-            self.flood_fill(temp_tiles_left, self.wires[1].x + 1, self.wires[1].y)
-            self.flood_fill(temp_tiles_right, self.wires[1].x - 1, self.wires[1].y)
-
-        # The resulting percentage of each flood fill
-        count_left = self._captured_count(temp_tiles_left)
-        count_right = self._captured_count(temp_tiles_right)
-
-        # Chooses smaller percentage and updates respective tiles in the flood fill
-        if count_left < count_right:
-            for i in range(self.size):
-                for j in range(self.size):
-                    if temp_tiles_left[i][j]:
-                        self.tiles[i][j].capture()
-        else:
-            for i in range(self.size):
-                for j in range(self.size):
-                    if temp_tiles_right[i][j]:
-                        self.tiles[i][j].capture()
+        changed = list(self.wire_coordinates)
+        for x, y in changed:
+            self.capture(x, y)
+
+        # Every uncaptured cell touching the wire belongs to one of the regions the wire may have split off
+        seeds = []
+        for wire_x, wire_y in self.wire_coordinates:
+            for x, y in ((wire_x - 1, wire_y), (wire_x + 1, wire_y), (wire_x, wire_y - 1), (wire_x, wire_y + 1)):
+                if not self.is_captured(x, y):
+                    seeds.append(y * self.size + x)
 
-        # Update perimeter and remove all wires
-        self.get_perimeter()
-        self.wires = []
-        self.wire_coordinates = []
+        # Captures every region except the largest one
+        for region in split_regions(self.grid, self.size, seeds):
+            for index in region:
+                self.capture(index % self.size, index // self.size)
+                changed.append((index % self.size, index // self.size))
 
-    def _captured_count(self, matrix: list) -> int:
+        # Update perimeter around the captured tiles and remove the wire
+        with PROFILER.section("perimeter"):
+            self.update_perimeter(changed)
+        self.clear_wire()
+
+    def clear_wire(self) -> tuple:
         """
-        Returns the current percentage of the field that is captured. Only works with boolean matrices
+        Removes the wire without capturing anything and returns the cell it started from, or None if there was no wire
         """
-        # Sum of captured tiles
-        curr = 0
-        for i in range(len(matrix)):
-            for j in range(len(matrix)):
-                if matrix[i][j]:
-                    curr += 1
-
-        return curr
+        if not self.wire_coordinates:
+            return None
+        start = self.wire_coordinates[0]
+        cells = list(self.wire_coordinates)
+        self.wire_coordinates.clear()
+        if self.tracking:
+            self.dirty.update(cells)
+        for x, y in cells:
+            self._patch(x, y)
+        return start
 
-    def flood_fill(self, matrix: list, x: int, y: int) -> None:
+    def flood_fill(self, matrix: bytearray, x: int, y: int) -> int:
         """
-        Fills boolean matrices at given <x> and <y> coordinates. Adapted from the following source:
-        https://stackoverflow.com/questions/19839947/flood-fill-in-python
+        Fills the uncaptured region of a matrix shaped like <grid> at given <x> and <y> coordinates and returns the
+        number of cells filled. See flood.flood_fill.
         """
-        if not matrix[y][x]:
-            matrix[y][x] = True
-            # recursively invoke flood fill on all surrounding cells:
-            self.flood_fill(matrix, x - 1, y)
-            self.flood_fill(matrix, x + 1, y)
-            self.flood_fill(matrix, x, y - 1)
-            self.flood_fill(matrix, x, y + 1)
+        return flood_fill(matrix, self.size, x, y)
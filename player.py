@@ -1,6 +1,6 @@
-import pygame
 from entity import Entity
-from wire import Wire
+from profiler import PROFILER
+from settings import *
 
 
 class Player(Entity):
@@ -12,6 +12,9 @@ class Player(Entity):
         y (int): y coordinate of the entity on the field
     """
 
+    __slots__ = ()
+    speed = PLAYER_SPEED
+
     def __init__(self, x: int, y: int) -> None:
         """
         Initialize the Player with the  <icon_file> and the given <x> and <y> position on the field.
@@ -22,32 +25,31 @@ class Player(Entity):
 
     def move(self, game: 'Game') -> None:
         """
-        Move the Player on the field based on the keyboard input. Movement is restricted to outer edge of field if
-        not "pushed".
+        Move the Player on the field based on the <action> of the current tick. Movement is restricted to outer edge
+        of field if not "pushed".
         """
         # Copy previous position
         new_x, new_y = self.x, self.y
 
-        # Update <x> or <y> values based on keyboard input
-        if game.key_pressed[pygame.K_LEFT] or game.key_pressed[pygame.K_a]:
+        # Update <x> or <y> values based on the action
+        if game.action & LEFT:
             new_x -= 1
-        elif game.key_pressed[pygame.K_RIGHT] or game.key_pressed[pygame.K_d]:
+        elif game.action & RIGHT:
             new_x += 1
-        elif game.key_pressed[pygame.K_UP] or game.key_pressed[pygame.K_w]:
+        elif game.action & UP:
             new_y -= 1
-        elif game.key_pressed[pygame.K_DOWN] or game.key_pressed[pygame.K_s]:
+        elif game.action & DOWN:
             new_y += 1
 
         # If space is held
-        if game.key_pressed[pygame.K_SPACE]:
+        if game.action & PUSH:
             # And moving onto uncaptured territory
             if ((self.x, self.y) in game.map.perimeter and not game.map.is_captured(new_x, new_y) or
                     not (self.x, self.y) in game.map.perimeter and not game.map.is_captured(new_x, new_y))\
                     and (new_x, new_y) not in game.map.wire_coordinates:
                 # Initial push
-                if not game.map.wires:
-                    game.map.wires.append(Wire(self.x, self.y))
-                    game.map.wire_coordinates.append((self.x, self.y))
+                if not game.map.wire_coordinates:
+                    game.map.push(self.x, self.y)
                     self.x, self.y = new_x, new_y
                     game.map.push(self.x, self.y)
                 # Following push
@@ -56,7 +58,8 @@ class Player(Entity):
                     game.map.push(self.x, self.y)
             # Returning to captured territory
             if not game.map.is_captured(self.x, self.y) and (new_x, new_y) in game.map.perimeter:
-                game.map.capture_field()
+                with PROFILER.section("capture_field"):
+                    game.map.capture_field()
                 self.x, self.y = new_x, new_y
         # If space is not held
         else:
@@ -0,0 +1,200 @@
+import bisect
+import collections
+import contextlib
+import csv
+import json
+import time
+import pygame
+from assets import load_sprite
+from settings import *
+
+
+# Shared context handed out while profiling is off, entering and leaving it does nothing
+NULL_SECTION = contextlib.nullcontext()
+
+# Upper bounds in milliseconds of the buckets of a section's histogram, the last bucket holds everything slower
+HISTOGRAM_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33)
+
+
+class Section:
+    """
+    Times one run of a named section of code and hands the result to its profiler when the section is left
+    """
+    # Private Attributes:
+    #   _profiler (Profiler): profiler the timing is reported to
+    #   _name (str): name of the section
+    #   _start (int): time the section was entered in nanoseconds
+
+    _profiler: 'Profiler'
+    _name: str
+    _start: int
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        """
+        Initialize a timer for the section <name> of <profiler>
+        """
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self) -> 'Section':
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._profiler.add(self._name, self._start, time.perf_counter_ns() - self._start)
+
+
+class Profiler:
+    """
+    Collects how long each phase of a frame takes. Code marks a phase with `with PROFILER.section(name):`, which
+    costs a single attribute check while the profiler is disabled.
+
+    Attributes:
+        enabled (bool): True iff sections are being timed
+        overlay (bool): True iff the timings are drawn over the top of the screen
+        samples (dict): durations in nanoseconds of the last <window> runs of every section, keyed by name
+        events (collections.deque): (name, start, duration) of the most recent runs of all sections in nanoseconds,
+            kept for exporting a trace
+    """
+    # Private Attributes:
+    #   _window (int): number of runs of each section kept in <samples>
+    #   _origin (int): time profiling was enabled in nanoseconds, trace timestamps count from it
+    #   _font (pygame.font.Font): font of the overlay, loaded the first time the overlay is drawn
+
+    enabled: bool
+    overlay: bool
+    samples: dict
+    events: collections.deque
+    _window: int
+    _origin: int
+    _font: pygame.font.Font
+
+    def __init__(self, window: int = 300, max_events: int = 200000) -> None:
+        """
+        Initialize a disabled profiler keeping <window> runs of each section for its statistics and the last
+        <max_events> runs of all sections for its trace
+        """
+        self.enabled = False
+        self.overlay = False
+        self.samples = {}
+        self.events = collections.deque(maxlen=max_events)
+        self._window = window
+        self._origin = time.perf_counter_ns()
+        self._font = None
+
+    def enable(self, overlay: bool = False) -> None:
+        """
+        Starts timing sections from a clean slate, drawing the overlay iff <overlay>
+        """
+        self.enabled = True
+        self.overlay = overlay
+        self.samples = {}
+        self.events.clear()
+        self._origin = time.perf_counter_ns()
+
+    def disable(self) -> None:
+        """
+        Stops timing sections, the timings collected so far are kept
+        """
+        self.enabled = False
+        self.overlay = False
+
+    def section(self, name: str, detail: str = None) -> contextlib.AbstractContextManager:
+        """
+        Returns a context that times the code run inside it as section <name>, or as "<name>:<detail>" if a <detail>
+        is given. Does nothing while the profiler is disabled.
+        """
+        if not self.enabled:
+            return NULL_SECTION
+        return Section(self, name if detail is None else name + ":" + detail)
+
+    def add(self, name: str, start: int, duration: int) -> None:
+        """
+        Records a run of section <name> that started at <start> and took <duration> nanoseconds
+        """
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = collections.deque(maxlen=self._window)
+        samples.append(duration)
+        self.events.append((name, start, duration))
+
+    def stats(self) -> dict:
+        """
+        Returns the number of runs, mean, median, 95th percentile and maximum in milliseconds of every section over
+        its recent runs
+        """
+        stats = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats[name] = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered) / 1e6,
+                "p50": ordered[len(ordered) // 2] / 1e6,
+                "p95": ordered[min(len(ordered) - 1, len(ordered) * 95 // 100)] / 1e6,
+                "max": ordered[-1] / 1e6,
+            }
+        return stats
+
+    def histogram(self, name: str) -> list:
+        """
+        Returns how many of the recent runs of section <name> fall in each bucket of HISTOGRAM_BOUNDS, with one more
+        count at the end for the runs slower than every bound
+        """
+        counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for duration in self.samples.get(name, ()):
+            counts[bisect.bisect_left(HISTOGRAM_BOUNDS, duration / 1e6)] += 1
+        return counts
+
+    def summary(self) -> str:
+        """
+        Returns a table of the stats and the histogram of every section over its recent runs, one section per line
+        sorted by name, printed when a profiled game exits
+        """
+        bounds = [f"<={bound}" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}"]
+        lines = [f"{'section':<24}{'count':>7}{'mean':>8}{'p95':>8}{'max':>8}  histogram ms " + " ".join(bounds)]
+        for name, stats in sorted(self.stats().items()):
+            counts = " ".join(f"{count:>{len(bound)}}" for count, bound in zip(self.histogram(name), bounds))
+            lines.append(f"{name:<24}{stats['count']:>7}{stats['mean']:>8.3f}{stats['p95']:>8.3f}{stats['max']:>8.3f}"
+                         f"  {'':13}{counts}")
+        return "\n".join(lines)
+
+    def export_trace(self, path: str) -> None:
+        """
+        Writes the recorded runs to <path> in the Chrome trace event format, viewable in chrome://tracing or Perfetto
+        """
+        events = [{"name": name, "ph": "X", "pid": 0, "tid": 0,
+                   "ts": (start - self._origin) / 1000, "dur": duration / 1000}
+                  for name, start, duration in self.events]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def export_csv(self, path: str) -> None:
+        """
+        Writes the recorded runs to <path> as CSV with one row per run of a section
+        """
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("section", "start_ms", "duration_ms"))
+            for name, start, duration in self.events:
+                writer.writerow((name, (start - self._origin) / 1e6, duration / 1e6))
+
+    def draw_overlay(self, screen: pygame.Surface) -> pygame.Rect:
+        """
+        Draws the 95th percentile of the main frame phases and of the input latency over the border at the top of
+        <screen> and returns the area it covers
+        """
+        if self._font is None:
+            self._font = pygame.font.Font("resources/game_font.ttf", 16)
+
+        area = pygame.Rect(0, 0, WIDTH, BORDER)
+        screen.blit(load_sprite("resources/background.png"), area, area)
+        stats = self.stats()
+        text = "  ".join(f"{name} {stats[name]['p95']:.2f}"
+                         for name in ("frame", "update", "draw", "flip", "input_latency") if name in stats)
+        screen.blit(self._font.render("p95 ms  " + text, False, (238, 236, 222)), (BORDER, 8))
+        return area
+
+
+# Process-wide profiler, disabled until something enables it
+PROFILER = Profiler()
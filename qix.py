@@ -18,35 +18,46 @@ class Qix(Entity):
     x_direction: int
     y_direction: int
     icon: pygame.Surface
+    __slots__ = ("x_direction", "y_direction")
+    speed = QIX_SPEED
+    STATE_FORMAT = Entity.STATE_FORMAT + "bb"
 
-    def __init__(self, x: int, y: int) -> None:
+    def __init__(self, x: int, y: int, rng: random.Random = random) -> None:
         """
-        Initialize the Player with the  <icon_file> and given <x> and <y> position on the game.
+        Initialize the Player with the  <icon_file> and given <x> and <y> position on the game. The starting
+        velocity is drawn from <rng>.
         """
         super().__init__(x, y)
-        self.set_icon("../images/sprite_qix.png")
+        self.set_icon("resources/sprite_qix.png")
         # Spawn the Qix with a random velocity of -1 or 1 in x and y direction
-        self.x_direction, self.y_direction = random.choice([-1, 1]), random.choice([-1, 1])
+        self.x_direction, self.y_direction = rng.choice([-1, 1]), rng.choice([-1, 1])
+
+    def get_state(self) -> tuple:
+        """
+        Returns the state of the entity followed by the direction of the Qix
+        """
+        return super().get_state() + (self.x_direction, self.y_direction)
+
+    def set_state(self, state: tuple) -> None:
+        """
+        Puts the Qix back in the <state> returned by get_state
+        """
+        super().set_state(state[:-2])
+        self.x_direction, self.y_direction = state[-2:]
 
     def move(self, game: 'Game') -> None:
         """
         A Qix is spawned randomly in the inner field and has a random velocity. Once it contacts the outer field it
         "bounces" in the opposite direction.
         """
-        if random.randrange(6) == 0:  # 1/6 chance for the qix velocity to change
-            self.x_direction, self.y_direction = random.choice([-1, 1]), random.choice([-1, 1])
+        if game.rng.randrange(6) == 0:  # 1/6 chance for the qix velocity to change
+            self.x_direction, self.y_direction = game.rng.choice([-1, 1]), game.rng.choice([-1, 1])
 
-        # Spawn Qix in a new location if stuck
+        # Spawn Qix on a random uncaptured cell if stuck
         if game.map.is_captured(self.x, self.y):
-            found = False
-            for i in range(game.map.size):
-                for j in range(game.map.size):
-                    if not game.map.tiles[j][i].captured:
-                        self.x, self.y = game.map.tiles[j][i].x, game.map.tiles[j][i].y
-                        found = True
-                        break
-                if found:
-                    break
+            cell = game.map.uncaptured.sample(game.rng)
+            if cell is not None:
+                self.x, self.y = cell
 
         # Checks if next tile in its path is captured and if it is it "bounces" off with the opposite velocity
         if game.map.is_captured(self.x + self.x_direction, self.y):
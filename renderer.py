@@ -0,0 +1,122 @@
+import pygame
+from camera import Camera
+from profiler import PROFILER
+from settings import *
+
+
+class Renderer:
+    """
+    A class that redraws only the parts of the screen that changed since the previous frame
+
+    Attributes:
+        screen (pygame.display): Screen that the game is being displayed on
+        camera (Camera): the part of the field shown on <screen>
+    """
+    # Private Attributes:
+    #   _map (Map): the map that was drawn last frame, a new map forces a full redraw
+    #   _entity_rects (list(pygame.Rect)): areas that were covered by an entity last frame
+    #   _interface (tuple): values shown on the interface last frame
+    #   _full (bool): True iff the whole screen has to be redrawn next frame
+
+    screen: pygame.display
+    camera: Camera
+    _map: 'Map'
+    _entity_rects: list
+    _interface: tuple
+    _full: bool
+
+    def __init__(self, screen: pygame.display) -> None:
+        """
+        Initialize the renderer for the given <screen>. The first frame is always drawn in full.
+        """
+        self.screen = screen
+        self.camera = Camera(GRIDSIZE, pygame.Rect(BORDER, BORDER, VIEW_SIZE * TILE_SIZE, VIEW_SIZE * TILE_SIZE))
+        self._map = None
+        self._entity_rects = []
+        self._interface = None
+        self._full = True
+
+    def invalidate(self) -> None:
+        """
+        Forces the next frame to redraw the whole screen
+        """
+        self._full = True
+
+    def draw(self, game: 'Game', alpha: float = None) -> list:
+        """
+        Draws every changed part of <game> onto <screen> and returns the list of rects that have to be updated on
+        the display. Entities are drawn <alpha> of the way into the current tick, see Entity.position.
+        """
+        player = (game.player.x, game.player.y) if alpha is None else game.player.position(alpha)
+
+        # Every level starts with the camera on the player, and its map records the cells that change from now on
+        if game.map is not self._map:
+            game.map.tracking = True
+            self.camera = Camera(game.map.size, self.camera.view)
+            self.camera.center(*player)
+            self._full = True
+        scrolled = self.camera.follow(*player)
+
+        entities = [game.qix, game.player] + game.sparx_list
+        offset = self.camera.offset
+        entity_rects = [entity.rect(alpha, offset) for entity in entities]
+        interface = game.interface_values()
+
+        # A new level or an invalidated screen is drawn from scratch
+        if self._full:
+            with PROFILER.section("background"):
+                game.draw_background()
+            self._draw_view(game, alpha)
+            self._map = game.map
+            self._entity_rects = entity_rects
+            self._interface = interface
+            self._full = False
+            return [self.screen.get_rect()]
+
+        rects = []
+
+        # Redraw the interface only when one of its values changed
+        if interface != self._interface:
+            with PROFILER.section("interface"):
+                rects.append(game.draw_interface())
+            self._interface = interface
+
+        # A scrolled view, or one with more changed cells than it shows, is cheapest to draw whole
+        cells = game.map.dirty
+        if scrolled or len(cells) > self.camera.view.width * self.camera.view.height // TILE_SIZE ** 2:
+            self._draw_view(game, alpha)
+            self._entity_rects = entity_rects
+            rects.append(self.camera.view)
+            return rects
+
+        self.screen.set_clip(self.camera.view)
+
+        # Cells changed by the map along with the cells entities are leaving and entering
+        with PROFILER.section("cells"):
+            columns, rows = self.camera.visible_cells()
+            for rect in self._entity_rects + entity_rects:
+                cells.update(self.camera.cells_in(rect))
+            for x, y in cells:
+                if x in columns and y in rows:
+                    game.map.draw_cell(self.screen, x, y, offset)
+                    rects.append(self.camera.cell_rect(x, y))
+            cells.clear()
+
+        # Entities are drawn over the redrawn tiles
+        with PROFILER.section("entities"):
+            for entity in entities:
+                entity.draw(self.screen, alpha, offset)
+        self._entity_rects = entity_rects
+
+        self.screen.set_clip(None)
+        return rects
+
+    def _draw_view(self, game: 'Game', alpha: float) -> None:
+        """
+        Draws the whole part of the field seen by <camera> along with the entities on it
+        """
+        self.screen.set_clip(self.camera.view)
+        with PROFILER.section("entities"):
+            game.draw_entity(alpha, self.camera)
+        self.screen.set_clip(None)
+        game.map.dirty.clear()
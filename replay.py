@@ -0,0 +1,206 @@
+"""
+Records the actions of a game to a compact binary file and replays them headless at full speed.
+
+A recording is a header holding the map size, difficulty and seed of the game followed by one byte per tick, the
+action performed on that tick. Every <checksum_every> ticks the stream also holds a checksum of the game, which the
+replay compares against to find the first tick where it stopped playing out the same.
+
+Run from the repository root:
+    python -m replay game.qixr [--repeat 10]
+    python -m replay game.qixr --record [--seed 0] [--ticks 5000] [--size 25] [--difficulty 1] [--checksum-every 50]
+"""
+import argparse
+import random
+import struct
+import sys
+import time
+
+from engine import Engine
+from runner import Bot
+from settings import *
+
+
+# Magic, format version, map size, difficulty, seed and checksum interval
+HEADER = struct.Struct("<4sBHHQI")
+MAGIC = b"QIXR"
+VERSION = 1
+
+# Seeds are stored as unsigned 64 bit integers
+MAX_SEED = 2 ** 64 - 1
+
+# Actions only use the low five bits, so a byte with this bit set starts a 4 byte checksum instead
+CHECKSUM = 0x80
+CHECKSUM_VALUE = struct.Struct("<I")
+
+
+class Recording:
+    """
+    The seed and the actions of every tick of a game, which is all it takes to play the game again
+
+    Attributes:
+        size (int): the length of the square map
+        difficulty (int): the difficulty the game started on
+        seed (int): the seed of the game's random number generator
+        checksum_every (int): ticks between checksums, or 0 to never take one
+        actions (bytearray): the action performed on every tick, one byte per tick
+        checksums (dict): checksum of the game after the tick it is keyed by
+    """
+
+    size: int
+    difficulty: int
+    seed: int
+    checksum_every: int
+    actions: bytearray
+    checksums: dict
+
+    def __init__(self, size: int, difficulty: int, seed: int, checksum_every: int = 0) -> None:
+        """
+        Initialize an empty recording of a game of <size> and <difficulty> played with <seed>. Raises ValueError if
+        <seed> cannot be saved, so the game is not played for nothing.
+        """
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"a recorded seed must be between 0 and {MAX_SEED}, got {seed}")
+        self.size = size
+        self.difficulty = difficulty
+        self.seed = seed
+        self.checksum_every = checksum_every
+        self.actions = bytearray()
+        self.checksums = {}
+
+    def record(self, engine: Engine, action: int) -> None:
+        """
+        Appends <action> after <engine> stepped with it, taking a checksum of <engine> when one is due
+        """
+        self.actions.append(action)
+        if self.checksum_every and len(self.actions) % self.checksum_every == 0:
+            self.checksums[len(self.actions)] = engine.checksum()
+
+    def engine(self) -> Engine:
+        """
+        Returns a new Engine in the state the recorded game started in
+        """
+        return Engine(self.size, self.difficulty, self.seed)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the recording to the file at <path>
+        """
+        stream = bytearray(HEADER.pack(MAGIC, VERSION, self.size, self.difficulty, self.seed, self.checksum_every))
+        for tick, action in enumerate(self.actions, 1):
+            stream.append(action)
+            if tick in self.checksums:
+                stream.append(CHECKSUM)
+                stream += CHECKSUM_VALUE.pack(self.checksums[tick])
+        with open(path, "wb") as file:
+            file.write(stream)
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        """
+        Returns the recording stored in the file at <path>
+        """
+        with open(path, "rb") as file:
+            stream = file.read()
+        magic, version, size, difficulty, seed, checksum_every = HEADER.unpack_from(stream)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+
+        recording = cls(size, difficulty, seed, checksum_every)
+        index = HEADER.size
+        while index < len(stream):
+            if stream[index] == CHECKSUM:
+                recording.checksums[len(recording.actions)] = CHECKSUM_VALUE.unpack_from(stream, index + 1)[0]
+                index += 1 + CHECKSUM_VALUE.size
+            else:
+                recording.actions.append(stream[index])
+                index += 1
+        return recording
+
+
+def replay(recording: Recording) -> dict:
+    """
+    Plays every action of <recording> on a new Engine as fast as possible and returns how long it took, the final
+    state and the first tick whose checksum did not match the recording, or None if the game played out the same
+    """
+    engine = recording.engine()
+    checksums = recording.checksums
+    diverged_at = None
+    state = engine.state()
+
+    start = time.perf_counter()
+    for tick, action in enumerate(recording.actions, 1):
+        state = engine.step(action)
+        if tick in checksums and diverged_at is None and engine.checksum() != checksums[tick]:
+            diverged_at = tick
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ticks": len(recording.actions),
+        "seconds": elapsed,
+        "ticks_per_second": len(recording.actions) / elapsed if elapsed else 0.0,
+        "diverged_at": diverged_at,
+        "state": state,
+    }
+
+
+def record_bot(size: int, difficulty: int, seed: int, ticks: int, checksum_every: int = 0) -> Recording:
+    """
+    Returns a recording of the runner's scripted bot playing <ticks> ticks of a game seeded with <seed>, or fewer if
+    it runs out of lives. Useful to produce replays to benchmark without playing them by hand.
+    """
+    recording = Recording(size, difficulty, seed, checksum_every)
+    engine = recording.engine()
+    bot = Bot(seed)
+    for _ in range(ticks):
+        action = bot.act(engine)
+        state = engine.step(action)
+        recording.record(engine, action)
+        if state["game_over"]:
+            break
+    return recording
+
+
+def parse_seed(value: str) -> int:
+    """
+    Returns the seed given on the command line, checking it fits in a recording
+    """
+    seed = int(value)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {MAX_SEED}")
+    return seed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--record", action="store_true", help="record the scripted bot to <path> instead")
+    parser.add_argument("--seed", type=parse_seed, default=None)
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=GRIDSIZE)
+    parser.add_argument("--difficulty", type=int, default=DIFFICULTY)
+    parser.add_argument("--checksum-every", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.record:
+        seed = random.randrange(2 ** 32) if args.seed is None else args.seed
+        recording = record_bot(args.size, args.difficulty, seed, args.ticks, args.checksum_every)
+        recording.save(args.path)
+        print(f"recorded {len(recording.actions)} ticks with seed {seed} to {args.path}")
+        return
+
+    recording = Recording.load(args.path)
+    rates = []
+    for _ in range(args.repeat):
+        result = replay(recording)
+        rates.append(result["ticks_per_second"])
+        if result["diverged_at"] is not None:
+            print(f"diverged from the recording at tick {result['diverged_at']}", file=sys.stderr)
+            sys.exit(1)
+    print(f"{result['ticks']} ticks, level {result['state']['level']}, {result['state']['captured']}% captured, "
+          f"{result['state']['lives']} lives")
+    print(f"best {max(rates):.0f} ticks/s, mean {sum(rates) / len(rates):.0f} ticks/s over {len(rates)} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Runs seeded headless games across a pool of processes and merges their results into one report.
+
+Run from the repository root:
+    python -m runner --difficulties 1 2 3 --sizes 25 50 --seeds 0-99 [--ticks 5000] [--processes 8]
+                     [--output report.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import Engine
+from settings import *
+
+
+# Action flag and direction of every move the bot can make
+MOVES = ((LEFT, (-1, 0)), (RIGHT, (1, 0)), (UP, (0, -1)), (DOWN, (0, 1)))
+
+
+class Bot:
+    """
+    A scripted player used to drive simulations. It slides along the perimeter and every so often cuts straight
+    across the uncaptured field until it reaches captured territory again.
+
+    Attributes:
+        rng (random.Random): source of every decision the bot makes
+        cut_chance (float): chance of starting a cut on each tick spent on the perimeter
+    """
+    # Private Attributes:
+    #   _direction (int): action flag of the direction the bot slides in
+    #   _cutting (int): action flag of the cut in progress, or NO_ACTION
+
+    rng: random.Random
+    cut_chance: float
+    _direction: int
+    _cutting: int
+
+    def __init__(self, seed: int, cut_chance: float = 0.1) -> None:
+        """
+        Initialize the bot with decisions drawn from <seed>
+        """
+        self.rng = random.Random(seed)
+        self.cut_chance = cut_chance
+        self._direction = LEFT
+        self._cutting = NO_ACTION
+
+    def act(self, engine: Engine) -> int:
+        """
+        Returns the action to perform on the next tick of <engine>
+        """
+        x, y = engine.player.x, engine.player.y
+
+        # Keep pushing until the cut closes and the Player is back on captured territory
+        if self._cutting:
+            if not engine.map.is_captured(x, y) or engine.map.wire_coordinates:
+                return self._cutting | PUSH
+            self._cutting = NO_ACTION
+
+        open_moves = [flag for flag, (dx, dy) in MOVES if not engine.map.is_captured(x + dx, y + dy)]
+        if open_moves and self.rng.random() < self.cut_chance:
+            self._cutting = self.rng.choice(open_moves)
+            return self._cutting | PUSH
+
+        # Slide along the perimeter, only changing direction when it runs out
+        perimeter_moves = [flag for flag, (dx, dy) in MOVES if (x + dx, y + dy) in engine.map.perimeter]
+        if self._direction not in perimeter_moves and perimeter_moves:
+            self._direction = self.rng.choice(perimeter_moves)
+        return self._direction
+
+
+def simulate(task: tuple) -> dict:
+    """
+    Plays one game for the (difficulty, size, seed, ticks, sample_every) <task> and returns its results. The game
+    and the bot are both seeded from <seed>, so the same task always gives the same results.
+    """
+    difficulty, size, seed, ticks, sample_every = task
+    engine = Engine(size, difficulty, seed)
+    bot = Bot(seed)
+
+    capture_curve = []
+    ticks_to_goal = []
+    level_start = 0
+    state = engine.state()
+    tick = 0
+    for tick in range(1, ticks + 1):
+        state = engine.step(bot.act(engine))
+        if state["level_cleared"]:
+            ticks_to_goal.append(tick - level_start)
+            level_start = tick
+        if tick % sample_every == 0:
+            capture_curve.append((tick, state["level"], state["captured"]))
+        if state["game_over"]:
+            break
+
+    return {
+        "difficulty": difficulty,
+        "size": size,
+        "seed": seed,
+        "ticks": tick,
+        "levels_cleared": len(ticks_to_goal),
+        "ticks_to_goal": ticks_to_goal,
+        "capture_curve": capture_curve,
+        "final_level": state["level"],
+        "final_captured": state["captured"],
+        "lives": state["lives"],
+    }
+
+
+def run_sweep(tasks: list, processes: int = None) -> iter:
+    """
+    Plays every task of <tasks> on a pool of <processes> worker processes, one per core by default, and yields each
+    result as soon as it is finished
+    """
+    with multiprocessing.Pool(processes) as pool:
+        chunksize = max(1, len(tasks) // ((processes or os.cpu_count()) * 8))
+        yield from pool.imap_unordered(simulate, tasks, chunksize)
+
+
+def aggregate(results: list) -> dict:
+    """
+    Merges per-run <results> into a report grouped by difficulty and grid size, along with every run's own results.
+    The capture curve of a group is the mean captured percentage at every sample tick over the runs still playing
+    at that tick. Results are ordered by seed first, so the report does not depend on the order the runs finished in.
+    """
+    results = sorted(results, key=lambda r: (r["difficulty"], r["size"], r["seed"]))
+    groups = {}
+    for result in results:
+        groups.setdefault((result["difficulty"], result["size"]), []).append(result)
+
+    report = []
+    for (difficulty, size), runs in groups.items():
+        cleared = [run["levels_cleared"] for run in runs]
+        goal_ticks = [ticks for run in runs for ticks in run["ticks_to_goal"]]
+        samples = {}
+        for run in runs:
+            for tick, _, captured in run["capture_curve"]:
+                samples.setdefault(tick, []).append(captured)
+        report.append({
+            "difficulty": difficulty,
+            "size": size,
+            "runs": len(runs),
+            "seeds": [run["seed"] for run in runs],
+            "levels_cleared_mean": sum(cleared) / len(runs),
+            "levels_cleared_min": min(cleared),
+            "levels_cleared_max": max(cleared),
+            "ticks_to_goal_mean": sum(goal_ticks) / len(goal_ticks) if goal_ticks else None,
+            "final_captured_mean": sum(run["final_captured"] for run in runs) / len(runs),
+            "capture_curve": [{"tick": tick, "runs": len(captured), "captured_mean": sum(captured) / len(captured)}
+                              for tick, captured in sorted(samples.items())],
+            "ticks": sum(run["ticks"] for run in runs),
+        })
+    return {"groups": report, "runs": len(results), "ticks": sum(result["ticks"] for result in results),
+            "results": results}
+
+
+def parse_seeds(values: list) -> list:
+    """
+    Returns the seeds given on the command line, either as single numbers or as inclusive ranges like 0-99
+    """
+    seeds = []
+    for value in values:
+        first, _, last = value.partition("-")
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--difficulties", type=int, nargs="+", default=[DIFFICULTY])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[GRIDSIZE])
+    parser.add_argument("--seeds", nargs="+", default=["0-31"])
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    tasks = [(difficulty, size, seed, args.ticks, args.sample_every)
+             for difficulty in args.difficulties for size in args.sizes for seed in parse_seeds(args.seeds)]
+
+    results = []
+    start = time.perf_counter()
+    for result in run_sweep(tasks, args.processes):
+        results.append(result)
+        print(f"[{len(results)}/{len(tasks)}] difficulty {result['difficulty']} size {result['size']} "
+              f"seed {result['seed']}: {result['levels_cleared']} levels cleared", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    report = aggregate(results)
+    report["seconds"] = elapsed
+    report["ticks_per_second"] = report["ticks"] / elapsed
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Hosts many headless games in one process and streams their state to clients over TCP or a Unix socket.
+
+A client starts a session by sending JOIN with the map size, difficulty, seed and tick rate it wants, then sends one
+byte whenever its action changes. Each action received is played for at least one tick and the last one is held
+until another arrives, like a key held down. The server answers with frames, each a FRAME header followed by its
+payload:
+
+    FULL   the size of the map, its captured cells packed eight to a byte and the wire, sent when the session starts
+           and on every new level
+    DELTA  the tick, scores and entity positions, then every cell that changed since the last frame as its flat index
+           shifted left by two with CELL_UNCAPTURED, CELL_CAPTURED or CELL_WIRE in the low bits
+    END    sent after the last DELTA of a game that is over, the server then closes the connection
+
+Every number is little-endian, cell indices are 32 bit and Sparx coordinates 16 bit.
+
+All sessions are ticked by one scheduler at their own rate. A session that falls more than its budget of ticks behind
+skips the rest. A client that does not read fast enough gets fewer frames rather than more buffered ones, the
+changes it missed go out with the next frame it has room for.
+
+Run from the repository root:
+    python -m server [--host 127.0.0.1] [--port 8765] [--unix PATH] [--max-size 100] [--max-difficulty 10]
+                     [--max-rate 30] [--budget 5] [--stats-every 5]
+"""
+import argparse
+import asyncio
+import collections
+import os
+import struct
+import sys
+import time
+from array import array
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import Engine
+from map import Map
+from snapshot import pack_bits, pack_cells, padded_length, unpack_bits, unpack_cells
+from settings import *
+
+
+# Magic, protocol version, map size, difficulty, seed and ticks per second
+JOIN = struct.Struct("<4sBHHQH")
+MAGIC = b"QIXN"
+VERSION = 1
+
+# Kind of frame and length of its payload
+FRAME = struct.Struct("<BI")
+FULL = 1
+DELTA = 2
+END = 3
+
+# Map size and number of wire cells, followed by the packed captured cells and the flat index of every wire cell
+FULL_HEADER = struct.Struct("<HI")
+
+# Tick, lives, level, captured and goal percentages, whether the game is over, player and Qix positions, number of
+# Sparx and number of changed cells, followed by the position of every Sparx and then the changed cells
+DELTA_HEADER = struct.Struct("<IiHBB?HHHHHI")
+
+# State of a changed cell in the low two bits of its entry in a DELTA frame
+CELL_UNCAPTURED = 0
+CELL_CAPTURED = 1
+CELL_WIRE = 2
+
+# Connections waiting to be accepted before new ones are refused
+BACKLOG = 1024
+
+# Every bit an action may have, anything else a client sends is ignored
+ALL_ACTIONS = LEFT | RIGHT | UP | DOWN | PUSH
+
+
+class Session:
+    """
+    One game hosted by the server and the connection of the client playing it
+
+    Attributes:
+        engine (Engine): the game being played
+        writer (asyncio.StreamWriter): connection the frames are sent to
+        rate (float): ticks run per second
+        ticks (int): ticks run so far
+        dropped (int): ticks skipped because the server fell more than its budget behind
+        coalesced (int): frames not sent because the client was not reading, their changes went out with a later one
+        closed (bool): True iff the game is over or the client left
+    """
+    # Private Attributes:
+    #   _actions (collections.deque): actions received that were not played yet
+    #   _action (int): action played while no new action is waiting
+    #   _lag (float): ticks that are due but were not run yet
+    #   _state (dict): state of the game after its last tick, see Engine.state
+    #   _map (Map): map the last FULL frame was sent for
+    #   _pending (bool): True iff ticks ran since the last frame was sent
+
+    engine: Engine
+    writer: asyncio.StreamWriter
+    rate: float
+    ticks: int
+    dropped: int
+    coalesced: int
+    closed: bool
+    _actions: collections.deque
+    _action: int
+    _lag: float
+    _state: dict
+    _map: 'Map'
+    _pending: bool
+
+    def __init__(self, engine: Engine, writer: asyncio.StreamWriter, rate: float) -> None:
+        """
+        Initialize a session playing <engine> at <rate> ticks per second for the client connected to <writer>
+        """
+        self.engine = engine
+        self.writer = writer
+        self.rate = rate
+        self.ticks = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._actions = collections.deque(maxlen=INPUT_BUFFER + 1)
+        self._action = NO_ACTION
+        self._lag = 0.0
+        self._state = engine.state()
+        self._map = None
+        self._pending = True
+
+    def receive(self, action: int) -> None:
+        """
+        Queues <action> to be played on a coming tick
+        """
+        self._actions.append(action & ALL_ACTIONS)
+
+    def advance(self, elapsed: float, budget: int) -> None:
+        """
+        Runs the ticks that became due over <elapsed> seconds, at most <budget> of them, the rest are dropped
+        """
+        self._lag += elapsed * self.rate
+        due = int(self._lag)
+        self._lag -= due
+        if due > budget:
+            self.dropped += due - budget
+            due = budget
+
+        for _ in range(due):
+            if self._actions:
+                self._action = self._actions.popleft()
+            self._state = self.engine.step(self._action)
+            self.ticks += 1
+            self._pending = True
+            if self._state["game_over"]:
+                break
+
+    def flush(self, high_water: int) -> None:
+        """
+        Sends the frames describing what changed since the last ones if any tick ran, unless more than <high_water>
+        bytes are still waiting to be sent to the client. Ends the session once its game is over.
+        """
+        if not self._pending:
+            return
+        if self.writer.transport.get_write_buffer_size() > high_water and not self._state["game_over"]:
+            self.coalesced += 1
+            return
+
+        map = self.engine.map
+        if map is not self._map:
+            self._map = map
+            map.tracking = True
+            map.dirty.clear()
+            wire = array("I", (y * map.size + x for x, y in map.wire_coordinates))
+            payload = FULL_HEADER.pack(map.size, len(wire)) + pack_bits(map.grid) + bytes(pack_cells(wire))
+            self.writer.write(frame(FULL, payload))
+
+        self.writer.write(frame(DELTA, self.delta()))
+        self._pending = False
+        if self._state["game_over"]:
+            self.writer.write(frame(END, b""))
+            self.close()
+
+    def delta(self) -> bytes:
+        """
+        Returns the payload of a DELTA frame for the current state and the cells that changed since the last one
+        """
+        map = self.engine.map
+        state = self._state
+        cells = array("I")
+        for x, y in map.dirty:
+            if (x, y) in map.wire_coordinates:
+                status = CELL_WIRE
+            else:
+                status = map.grid[y * map.size + x]
+            cells.append((y * map.size + x) << 2 | status)
+        map.dirty.clear()
+
+        sparx = struct.pack(f"<{2 * len(state['sparx'])}H", *(value for cell in state["sparx"] for value in cell))
+        return DELTA_HEADER.pack(self.ticks, state["lives"], state["level"], state["captured"], state["goal"],
+                                 state["game_over"], *state["player"], *state["qix"], len(state["sparx"]),
+                                 len(cells)) + sparx + bytes(pack_cells(cells))
+
+    def close(self) -> None:
+        """
+        Ends the session and closes its connection once everything written has been sent
+        """
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+
+class Server:
+    """
+    Runs every session on one scheduler. Each round advances every session by the time since the last round and
+    sends each client at most one DELTA however many ticks it ran, so a busy server sends fewer, larger frames.
+
+    Attributes:
+        sessions (set): the sessions being played
+        max_size (int): largest map a client may ask for
+        max_difficulty (int): highest difficulty, that is most Sparx, a client may ask for
+        max_rate (float): most ticks per second a client may ask for
+        budget (int): most ticks a session runs in one round, the rest are dropped
+        high_water (int): bytes waiting to be sent to a client beyond which it gets no new frames
+        interval (float): seconds between the starts of two rounds
+        rounds (collections.deque): durations in seconds of the most recent rounds
+    """
+    # Private Attributes:
+    #   _ticks (int): ticks run by sessions that already ended
+    #   _dropped (int): ticks dropped by sessions that already ended
+    #   _coalesced (int): frames held back from sessions that already ended
+    #   _maps (dict): new map of every size asked for so far, copied for each game instead of built on the event loop
+
+    sessions: set
+    max_size: int
+    max_difficulty: int
+    max_rate: float
+    budget: int
+    high_water: int
+    interval: float
+    rounds: collections.deque
+    _ticks: int
+    _dropped: int
+    _coalesced: int
+    _maps: dict
+
+    def __init__(self, max_size: int = 100, max_difficulty: int = 10, max_rate: float = 30,
+                 budget: int = MAX_TICKS_PER_FRAME, high_water: int = 64 * 1024,
+                 interval: float = 1 / (2 * TICK_RATE)) -> None:
+        """
+        Initialize a server with no sessions
+        """
+        self.sessions = set()
+        self.max_size = max_size
+        self.max_difficulty = max_difficulty
+        self.max_rate = max_rate
+        self.budget = budget
+        self.high_water = high_water
+        self.interval = interval
+        self.rounds = collections.deque(maxlen=300)
+        self._ticks = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._maps = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Plays a session for the client connected through <reader> and <writer> until its game is over or it leaves
+        """
+        try:
+            magic, version, size, difficulty, seed, rate = JOIN.unpack(await reader.readexactly(JOIN.size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if (magic != MAGIC or version != VERSION or not 3 <= size <= self.max_size
+                or not 1 <= difficulty <= self.max_difficulty or rate < 1):
+            writer.close()
+            return
+
+        # Building a map takes far longer than copying one, so each size is only built once
+        if size not in self._maps:
+            self._maps[size] = Map(size)
+        session = Session(Engine(size, difficulty, seed, self._maps[size]), writer, min(rate, self.max_rate))
+        self.sessions.add(session)
+        try:
+            while not session.closed:
+                actions = await reader.read(256)
+                if not actions:
+                    break
+                for action in actions:
+                    session.receive(action)
+        except ConnectionError:
+            pass
+        finally:
+            session.close()
+
+    async def schedule(self) -> None:
+        """
+        Runs rounds every <interval> seconds forever
+        """
+        last = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            elapsed, last = start - last, start
+            for session in list(self.sessions):
+                if not session.closed:
+                    session.advance(elapsed, self.budget)
+                    session.flush(self.high_water)
+                if session.closed:
+                    self.sessions.discard(session)
+                    self._ticks += session.ticks
+                    self._dropped += session.dropped
+                    self._coalesced += session.coalesced
+            duration = time.perf_counter() - start
+            self.rounds.append(duration)
+            await asyncio.sleep(max(0.0, self.interval - duration))
+
+    def stats(self) -> dict:
+        """
+        Returns the number of sessions, the ticks run and dropped so far, the frames held back from slow clients and
+        the 95th percentile of the recent round durations in milliseconds
+        """
+        rounds = sorted(self.rounds)
+        return {
+            "sessions": len(self.sessions),
+            "ticks": self._ticks + sum(session.ticks for session in self.sessions),
+            "dropped": self._dropped + sum(session.dropped for session in self.sessions),
+            "coalesced": self._coalesced + sum(session.coalesced for session in self.sessions),
+            "round_p95_ms": rounds[min(len(rounds) - 1, len(rounds) * 95 // 100)] * 1e3 if rounds else 0.0,
+        }
+
+
+def frame(kind: int, payload: bytes) -> bytes:
+    """
+    Returns a frame of <kind> carrying <payload>
+    """
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple:
+    """
+    Returns the kind and payload of the next frame from <reader>
+    """
+    kind, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return kind, await reader.readexactly(length)
+
+
+def decode_full(payload: bytes) -> tuple:
+    """
+    Returns the size, captured cells as a bytearray shaped like Map.grid and wire cell indices of a FULL payload
+    """
+    size, wire_count = FULL_HEADER.unpack_from(payload)
+    view = memoryview(payload)[FULL_HEADER.size:]
+    grid = unpack_bits(view[:padded_length(size * size)], size * size)
+    wire = array("I", unpack_cells(view, padded_length(size * size), wire_count, "I"))
+    return size, grid, wire
+
+
+def decode_delta(payload: bytes) -> dict:
+    """
+    Returns the fields of a DELTA payload
+    """
+    (tick, lives, level, captured, goal, game_over, player_x, player_y, qix_x, qix_y, sparx_count,
+     cell_count) = DELTA_HEADER.unpack_from(payload)
+    sparx = struct.unpack_from(f"<{2 * sparx_count}H", payload, DELTA_HEADER.size)
+    cells = unpack_cells(memoryview(payload), DELTA_HEADER.size + sparx_count * 4, cell_count, "I")
+    return {
+        "tick": tick,
+        "lives": lives,
+        "level": level,
+        "captured": captured,
+        "goal": goal,
+        "game_over": game_over,
+        "player": (player_x, player_y),
+        "qix": (qix_x, qix_y),
+        "sparx": list(zip(sparx[::2], sparx[1::2])),
+        "cells": [(index >> 2, index & 3) for index in cells],
+    }
+
+
+async def serve(server: Server, host: str, port: int, unix: str = None, stats_every: float = 0) -> None:
+    """
+    Accepts clients on the Unix socket at <unix>, or on <host> and <port> if none is given, and runs <server> until
+    cancelled. Prints the server's stats every <stats_every> seconds to stderr if it is not 0.
+    """
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix, backlog=BACKLOG)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, backlog=BACKLOG)
+    for sock in listener.sockets:
+        print(f"listening on {sock.getsockname()}", file=sys.stderr, flush=True)
+
+    scheduler = asyncio.create_task(server.schedule())
+    try:
+        async with listener:
+            while True:
+                await asyncio.sleep(stats_every or 3600)
+                if stats_every:
+                    print(server.stats(), file=sys.stderr, flush=True)
+    finally:
+        scheduler.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", default=None, help="listen on a Unix socket at PATH instead")
+    parser.add_argument("--max-size", type=int, default=100)
+    parser.add_argument("--max-difficulty", type=int, default=10)
+    parser.add_argument("--max-rate", type=float, default=30)
+    parser.add_argument("--budget", type=int, default=MAX_TICKS_PER_FRAME)
+    parser.add_argument("--stats-every", type=float, default=0)
+    args = parser.parse_args()
+
+    server = Server(args.max_size, args.max_difficulty, args.max_rate, args.budget)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix, args.stats_every))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,8 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
 # Global variable used for game settings
-WIDTH = 900
-HEIGHT = 600
+WIDTH = 664
+HEIGHT = 752
 FPS = 60
 TITLE = "Qix"
 DIFFICULTY = 1
@@ -12,5 +12,30 @@ GRIDSIZE = 25
 
 # Global variable used for sizing
 TILE_SIZE = 24
+BORDER = 32
+# Cells of the field shown on the screen at once, larger maps scroll to follow the player
+VIEW_SIZE = 25
+# Cells the camera keeps between the player and the edge of the view
+CAMERA_MARGIN = 6
+# Largest map drawn from one pre-rendered surface, bigger maps are drawn tile by tile to save memory
+MAX_BAKED_SIZE = 100
 
+# Global variables representing the player actions, combined as bit flags
+NO_ACTION = 0
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+PUSH = 16
+# Taps made faster than the tick rate that are kept and played out one per tick, 0 only plays the latest tap
+INPUT_BUFFER = 2
 
+# Global variables used for timing, the simulation runs at TICK_RATE ticks and entities move SPEED cells per second
+TICK_RATE = 7
+PLAYER_SPEED = 7
+QIX_SPEED = 3.5
+SPARX_SPEED = 3.5
+# Ticks that can be caught up on in one frame after a stall, any more are dropped
+MAX_TICKS_PER_FRAME = 5
+# Ticks after losing a life during which the player cannot be hit again
+INVULNERABLE_TICKS = 7
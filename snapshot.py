@@ -0,0 +1,119 @@
+"""
+Binary layout shared by the Map and Engine snapshots.
+
+A map snapshot is MAP_HEADER followed by the captured cells packed eight to a byte, then the perimeter cells and the
+wire cells, each as an array of flat cell indices in the order the map keeps them. Orders are kept so a restored game
+picks the same cells from them and plays out exactly like the original. The uncaptured cells are not stored, which
+of them is picked at random depends only on the captured cells.
+
+Every number is stored little-endian whatever the byte order of the machine, the cell indices as 32 bit integers.
+
+An engine snapshot is ENGINE_HEADER followed by the state of the random number generator, the map snapshot and the
+state of the Player, the Qix and every Sparx in the struct format of their class. The arrays start on a 4 byte boundary
+so they can be read in place through memoryview.cast.
+"""
+import mmap
+import random
+import struct
+import sys
+from array import array
+
+
+SNAPSHOT_VERSION = 2
+
+# Magic, version, map size, perimeter and wire cell counts
+MAP_HEADER = struct.Struct("<4sBxxxIII")
+MAP_MAGIC = b"QIXM"
+
+# Magic, version, map size, difficulty, goal, lives, ticks of invulnerability, action, number of Sparx and length of
+# the map snapshot
+ENGINE_HEADER = struct.Struct("<4sBxxxIIIiIIII")
+ENGINE_MAGIC = b"QIXS"
+
+# Mersenne Twister state words and position, then whether a spare gaussian is kept and its value
+RNG_STATE = struct.Struct("<625I?xxxd")
+
+# Bytes taken by a cell index, the item size of the "I" arrays the cells are written from
+CELL_SIZE = 4
+assert array("I").itemsize == CELL_SIZE, "cell arrays need 32 bit C ints"
+
+# True iff cell arrays are already in the byte order of a snapshot and can be written and read without copying them
+_NATIVE = sys.byteorder == "little"
+
+# Translations between cells stored as 0 or 1 bytes and the same cells written as binary digits
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def pack_bits(cells: bytearray) -> bytes:
+    """
+    Returns the 0 or 1 bytes of <cells> packed eight to a byte, padded with zeros to a multiple of 4 bytes. The cells
+    are read as one binary number, so the packing runs in C rather than one cell at a time.
+    """
+    length = padded_length(len(cells))
+    digits = bytes(cells).translate(_TO_DIGITS) + b"0" * (length * 8 - len(cells))
+    return int(digits, 2).to_bytes(length, "big")
+
+
+def unpack_bits(bits: memoryview, count: int) -> bytearray:
+    """
+    Returns the first <count> cells of the packed <bits> as 0 or 1 bytes, the reverse of pack_bits
+    """
+    digits = format(int.from_bytes(bits, "big"), f"0{len(bits) * 8}b").encode()
+    return bytearray(digits[:count].translate(_FROM_DIGITS))
+
+
+def padded_length(count: int) -> int:
+    """
+    Returns the number of bytes <count> packed cells take up, a multiple of 4
+    """
+    return (count + 31) // 32 * 4
+
+
+def pack_cells(cells: array) -> array:
+    """
+    Returns the cell indices in <cells>, an array or a memoryview of 32 bit integers, in the byte order of a
+    snapshot. They are returned as they are on little-endian machines and byteswapped into a new array otherwise.
+    """
+    if _NATIVE:
+        return cells
+    swapped = array(cells.typecode if isinstance(cells, array) else cells.format, cells)
+    swapped.byteswap()
+    return swapped
+
+
+def unpack_cells(view: memoryview, offset: int, count: int, typecode: str) -> memoryview:
+    """
+    Returns the <count> cell indices stored at <offset> of <view> as 32 bit integers of <typecode>. They are read in
+    place on little-endian machines and byteswapped into a new array otherwise.
+    """
+    cells = view[offset:offset + count * CELL_SIZE].cast(typecode)
+    if _NATIVE:
+        return cells
+    swapped = array(typecode, cells)
+    swapped.byteswap()
+    return swapped
+
+
+def pack_rng(rng: random.Random) -> bytes:
+    """
+    Returns the state of <rng>
+    """
+    _, words, gauss = rng.getstate()
+    return RNG_STATE.pack(*words, gauss is not None, gauss or 0.0)
+
+
+def unpack_rng(view: memoryview, offset: int) -> tuple:
+    """
+    Returns the random number generator state stored at <offset> of <view>, ready for random.Random.setstate
+    """
+    values = RNG_STATE.unpack_from(view, offset)
+    return 3, values[:625], values[626] if values[625] else None
+
+
+def load(path: str) -> memoryview:
+    """
+    Returns the snapshot saved at <path> mapped into memory, so restoring it only reads the pages it needs
+    """
+    with open(path, "rb") as file:
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
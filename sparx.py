@@ -1,5 +1,6 @@
 import pygame
 from entity import Entity
+from settings import *
 
 
 class Sparx(Entity):
@@ -11,9 +12,15 @@ class Sparx(Entity):
         y (int): y coordinate of the entity on the field
         icon (str): the file path containing the image representing this entity
     """
+    # Private Attributes:
+    #   _oriented (bool): True iff the direction has been lined up with the perimeter the Sparx is on
+
     x: int
     y: int
     icon: pygame.Surface
+    __slots__ = ("clockwise", "x_direction", "y_direction", "_oriented")
+    speed = SPARX_SPEED
+    STATE_FORMAT = Entity.STATE_FORMAT + "bb??"
 
     def __init__(self, x: int, y: int, direction: bool) -> None:
         """
@@ -21,35 +28,57 @@ class Sparx(Entity):
         """
 
         super().__init__(x, y)
-        self.set_icon("../images/sprite_sparx.png")
+        self.set_icon("resources/sprite_sparx.png")
         # Spawn the Sparx with a clockwise or counter-clockwise direction traversing the <game.map.perimeter> list
         self.clockwise = direction
         if self.clockwise:
             self.x_direction, self.y_direction = 1, 0
         else:
             self.x_direction, self.y_direction = -1, 0
+        self._oriented = False
+
+    def get_state(self) -> tuple:
+        """
+        Returns the state of the entity followed by the direction of the Sparx and which way it travels
+        """
+        return super().get_state() + (self.x_direction, self.y_direction, self.clockwise, self._oriented)
+
+    def set_state(self, state: tuple) -> None:
+        """
+        Puts the Sparx back in the <state> returned by get_state
+        """
+        super().set_state(state[:-4])
+        self.x_direction, self.y_direction, self.clockwise, self._oriented = state[-4:]
+
+    def reverse(self) -> None:
+        """
+        Turns the Sparx around so it travels the perimeter the other way
+        """
+        self.clockwise = not self.clockwise
+        self.x_direction, self.y_direction = -self.x_direction, -self.y_direction
 
     def move(self, game: 'Game') -> None:
         """
         The Sparx is spawned on the edge of the field and its movement its restricted to its edge. If the Sparx comes
         into contact with the <Player> its movement is then reversed.
         """
+        # Nowhere to go once the whole field is captured
+        if not game.map.perimeter:
+            return
+
         if (self.x, self.y) not in game.map.perimeter:
             (self.x, self.y) = game.map.perimeter[0]
+            self._oriented = False
 
-        if (self.x + self.x_direction, self.y + self.y_direction) not in game.map.perimeter:
-            if self.x_direction:
-                self.x_direction = 0
-                if (self.x, self.y - 1) in game.map.perimeter:
-                    self.y_direction = -1
-                else:
-                    self.y_direction = 1
-            else:
-                self.y_direction = 0
-                if (self.x - 1, self.y) in game.map.perimeter:
-                    self.x_direction = -1
-                else:
-                    self.x_direction = 1
-
+        # Face clockwise or counter-clockwise along the perimeter the first time the Sparx moves from a cell. That is
+        # already the direction to leave the cell in, so it is not turned again.
+        if not self._oriented:
+            self.x_direction, self.y_direction = game.map.start_direction(self.x, self.y, self.clockwise)
+            self._oriented = True
+        else:
+            # Follow the perimeter, turning wherever it turns
+            self.x_direction, self.y_direction = game.map.next_direction(self.x, self.y,
+                                                                         (self.x_direction, self.y_direction),
+                                                                         self.clockwise)
         self.x += self.x_direction
         self.y += self.y_direction
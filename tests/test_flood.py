@@ -0,0 +1,56 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from flood import split_regions
+from map import Map
+
+
+def components(matrix: bytearray, size: int, seeds: list) -> list:
+    """
+    Returns the sizes of the regions of uncaptured cells containing <seeds>, found one cell at a time
+    """
+    seen = set()
+    sizes = []
+    for seed in seeds:
+        if matrix[seed] or seed in seen:
+            continue
+        seen.add(seed)
+        stack = [seed]
+        count = 0
+        while stack:
+            index = stack.pop()
+            count += 1
+            x, y = index % size, index // size
+            for i, j in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                neighbour = j * size + i
+                if 0 <= i < size and 0 <= j < size and not matrix[neighbour] and neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        sizes.append(count)
+    return sizes
+
+
+def test_split_regions_leaves_the_largest_region():
+    rng = random.Random(0)
+    for _ in range(2000):
+        size = rng.randint(3, 16)
+        matrix = bytearray(rng.random() < 0.4 for _ in range(size * size))
+        seeds = [rng.randrange(size * size) for _ in range(rng.randint(1, 12))]
+        expected = sorted(components(matrix, size, seeds))
+        captured = sorted(len(region) for region in split_regions(matrix, size, seeds))
+        assert captured == expected[:-1]
+
+
+def test_capture_field_keeps_a_region_grown_from_several_seeds():
+    map = Map(12)
+    for x, y in ((9, 11), (9, 10), (9, 9), (8, 9), (7, 9), (7, 8), (6, 8), (5, 8), (4, 8), (3, 8), (2, 8), (2, 7),
+                 (1, 7), (1, 6), (1, 5), (2, 5), (3, 5), (3, 6), (4, 6), (5, 6), (5, 5), (6, 5), (6, 4), (6, 3),
+                 (7, 3), (7, 2), (8, 2), (9, 2), (10, 2), (10, 1)):
+        map.push(x, y)
+    map.capture_field()
+
+    # The wire splits the field into regions of 1, 15, 26 and 29 cells
+    assert map.size ** 2 - map.captured_count == 29
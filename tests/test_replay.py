@@ -0,0 +1,41 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pytest
+
+from replay import HEADER, Recording, record_bot, replay
+
+
+def test_recording_round_trip(tmp_path):
+    recording = record_bot(25, 2, 11, 2000, checksum_every=50)
+    path = tmp_path / "game.qixr"
+    recording.save(str(path))
+    loaded = Recording.load(str(path))
+
+    assert (loaded.size, loaded.difficulty, loaded.seed, loaded.checksum_every) == (25, 2, 11, 50)
+    assert loaded.actions == recording.actions
+    assert loaded.checksums == recording.checksums
+    assert replay(loaded)["diverged_at"] is None
+
+
+def test_recording_header_is_little_endian(tmp_path):
+    path = tmp_path / "game.qixr"
+    Recording(25, 3, 2 ** 40 + 5).save(str(path))
+    expected = b"QIXR\x01\x19\x00\x03\x00" + (2 ** 40 + 5).to_bytes(8, "little") + bytes(4)
+    assert path.read_bytes()[:HEADER.size] == expected
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "game.qixr"
+    path.write_bytes(b"QIXS" + bytes(HEADER.size))
+    with pytest.raises(ValueError):
+        Recording.load(str(path))
+
+
+def test_seeds_that_cannot_be_saved_are_rejected_up_front():
+    with pytest.raises(ValueError):
+        Recording(25, 1, -1)
+    with pytest.raises(ValueError):
+        Recording(25, 1, 2 ** 64)
@@ -0,0 +1,97 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import Engine
+from server import CELL_CAPTURED, CELL_WIRE, DELTA, END, FRAME, FULL, Session, decode_delta, decode_full
+
+
+class Connection:
+    """
+    Stands in for the stream writer of a client, keeping every byte written to it
+    """
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.transport = self
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    def close(self) -> None:
+        self.closed = True
+
+    def get_write_buffer_size(self) -> int:
+        return 0
+
+
+def frames(data: bytearray) -> list:
+    """
+    Returns the kind and payload of every frame in <data>, checking it holds whole frames only
+    """
+    result = []
+    offset = 0
+    while offset < len(data):
+        kind, length = FRAME.unpack_from(data, offset)
+        offset += FRAME.size
+        result.append((kind, bytes(data[offset:offset + length])))
+        offset += length
+    assert offset == len(data)
+    return result
+
+
+def test_frames_rebuild_the_served_game():
+    connection = Connection()
+    session = Session(Engine(25, 2, 7), connection, 10)
+    rng = random.Random(3)
+    grid, wire = None, set()
+
+    for _ in range(400):
+        if rng.random() < 0.1:
+            session.receive(rng.randrange(32))
+        session.advance(0.1, 5)
+        session.flush(0)
+        for kind, payload in frames(connection.data):
+            if kind == FULL:
+                size, grid, cells = decode_full(payload)
+                assert size == 25
+                wire = set(cells)
+            elif kind == DELTA:
+                delta = decode_delta(payload)
+                for index, status in delta["cells"]:
+                    if status == CELL_WIRE:
+                        wire.add(index)
+                    else:
+                        grid[index] = status == CELL_CAPTURED
+                        wire.discard(index)
+            else:
+                assert kind == END
+        connection.data.clear()
+
+        engine = session.engine
+        assert bytes(grid) == bytes(engine.map.grid)
+        assert wire == {y * engine.map.size + x for x, y in engine.map.wire_coordinates}
+        assert delta["tick"] == session.ticks
+        assert delta["player"] == (engine.player.x, engine.player.y)
+        assert delta["qix"] == (engine.qix.x, engine.qix.y)
+        assert delta["sparx"] == [(sparx.x, sparx.y) for sparx in engine.sparx_list]
+        assert delta["lives"] == engine.state()["lives"]
+        if session.closed:
+            break
+
+
+def test_frames_are_little_endian():
+    connection = Connection()
+    session = Session(Engine(25, 1, 0), connection, 10)
+    session.engine.map.push(3, 4)
+    session.flush(0)
+    kind, payload = frames(connection.data)[0]
+    assert kind == FULL
+
+    # Map size and wire length, then the wire cell after the packed grid
+    assert payload[:6] == (25).to_bytes(2, "little") + (1).to_bytes(4, "little")
+    assert payload[-4:] == (4 * 25 + 3).to_bytes(4, "little")
+    assert list(decode_full(payload)[2]) == [4 * 25 + 3]
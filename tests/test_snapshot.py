@@ -0,0 +1,84 @@
+import os
+import random
+import struct
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pytest
+
+import snapshot
+from engine import Engine
+from map import Map
+
+
+def play(engine: Engine, rng: random.Random, ticks: int) -> list:
+    """
+    Steps <engine> with <ticks> random actions and returns every state
+    """
+    return [engine.step(rng.randrange(32)) for _ in range(ticks)]
+
+
+def test_map_round_trip():
+    engine = Engine(25, 2, 3)
+    play(engine, random.Random(0), 1500)
+    restored = Map(25)
+    restored.restore(engine.map.snapshot())
+
+    assert restored.grid == engine.map.grid
+    assert restored.captured_count == engine.map.captured_count
+    assert list(restored.perimeter) == list(engine.map.perimeter)
+    assert restored.perimeter_links == engine.map.perimeter_links
+    assert list(restored.wire_coordinates) == list(engine.map.wire_coordinates)
+    assert list(restored.uncaptured) == list(engine.map.uncaptured)
+    assert restored.uncaptured.sample(random.Random(1)) == engine.map.uncaptured.sample(random.Random(1))
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_engine_round_trip_plays_out_the_same(monkeypatch, native):
+    # The byteswapped path is what a big-endian machine writes and reads
+    monkeypatch.setattr(snapshot, "_NATIVE", native)
+    rng = random.Random(4)
+    engine = Engine(25, 3, 5)
+    play(engine, rng, 1000)
+    saved = engine.snapshot()
+
+    restored = Engine(25, 1, 9)
+    restored.restore(saved)
+    assert restored.checksum() == engine.checksum()
+    assert restored.snapshot() == saved
+    assert play(restored, random.Random(6), 2000) == play(engine, random.Random(6), 2000)
+
+
+def test_map_snapshot_cells_are_little_endian():
+    map = Map(25)
+    map.push(3, 4)
+    saved = map.snapshot()
+
+    offset = snapshot.MAP_HEADER.size + snapshot.padded_length(25 * 25)
+    assert struct.unpack_from("<I", saved, offset)[0] == 0 * 25 + 0
+    assert struct.unpack_from("<I", saved, offset + 4 * len(map.perimeter))[0] == 4 * 25 + 3
+
+
+def test_snapshot_is_compact():
+    map = Map(500)
+    # Packed captured cells plus the perimeter, nothing per uncaptured cell
+    assert len(map.snapshot()) < 500 * 500 // 8 + 4 * len(map.perimeter) + 64
+
+
+def test_load_restores_from_a_file(tmp_path):
+    engine = Engine(25, 2, 7)
+    play(engine, random.Random(8), 500)
+    path = tmp_path / "game.qixs"
+    path.write_bytes(engine.snapshot())
+
+    restored = Engine(25, 1, 0)
+    restored.restore(snapshot.load(str(path)))
+    assert restored.checksum() == engine.checksum()
+
+
+def test_restore_rejects_other_sizes_and_formats():
+    with pytest.raises(ValueError):
+        Engine(30, 1, 0).restore(Engine(25, 1, 0).snapshot())
+    with pytest.raises(ValueError):
+        Map(25).restore(b"not a snapshot at all")
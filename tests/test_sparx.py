@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from batch import BatchEngine
+from engine import Engine
+from sparx import Sparx
+
+
+SIZE = 10
+
+# First two cells each Sparx reaches from every corner of a new map, travelling clockwise or counter-clockwise on
+# the screen
+FIRST_STEPS = {
+    True: {(0, 0): [(1, 0), (2, 0)], (9, 0): [(9, 1), (9, 2)], (9, 9): [(8, 9), (7, 9)], (0, 9): [(0, 8), (0, 7)]},
+    False: {(0, 0): [(0, 1), (0, 2)], (0, 9): [(1, 9), (2, 9)], (9, 9): [(9, 8), (9, 7)], (9, 0): [(8, 0), (7, 0)]},
+}
+
+
+def test_sparx_leave_corners_in_their_direction():
+    engine = Engine(SIZE, 1, 0)
+    for clockwise, corners in FIRST_STEPS.items():
+        for (x, y), expected in corners.items():
+            sparx = Sparx(x, y, clockwise)
+            path = []
+            for _ in expected:
+                sparx.move(engine)
+                path.append((sparx.x, sparx.y))
+            assert path == expected, (clockwise, (x, y))
+
+
+def test_batch_sparx_leave_corners_in_their_direction():
+    engine = BatchEngine(1, SIZE, 1, max_sparx=1, seed=0)
+    for clockwise, corners in FIRST_STEPS.items():
+        for (x, y), expected in corners.items():
+            engine.sparx[0, 0] = (x, y)
+            engine.sparx_direction[0, 0] = -1
+            engine.sparx_clockwise[0, 0] = clockwise
+            engine.sparx_active[0, 0] = True
+            path = []
+            for _ in expected:
+                engine._move_sparx(np.ones(1, dtype=bool))
+                path.append(tuple(engine.sparx[0, 0].tolist()))
+            assert path == expected, (clockwise, (x, y))
@@ -0,0 +1,20 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from map import Map
+
+
+def test_tile_reads_and_writes_through_to_the_map():
+    map = Map(10)
+    tile = map.tile(3, 3)
+    assert not tile.captured
+
+    tile.capture()
+    assert map.is_captured(3, 3)
+    assert (3, 3) not in map.uncaptured
+    assert tile.captured
+
+    map.tile(4, 4).capture()
+    assert map.captured_count == 38
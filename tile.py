@@ -1,10 +1,16 @@
 import pygame
+from assets import load_sprite
 from entity import Entity
 
 
+# Sprite of a tile indexed by its captured status, so Map can draw a cell straight from its grid
+TILE_SPRITES = ("resources/sprite_unclaimed.png", "resources/sprite_claimed.png")
+
+
 class Tile(Entity):
     """
-    A class representing the Tile in the game
+    A class representing the Tile in the game. A Map keeps only the captured status of its cells, a Tile is a view of
+    one cell made on demand by Map.tile that reads and changes that status in the map itself.
 
     Attributes:
         x (int): x coordinate of the entity on the field
@@ -12,22 +18,39 @@ class Tile(Entity):
         icon (str): the file path containing the image representing this entity
         captured (bool): True iff tile is captured
     """
+    # Private Attributes:
+    #   _map (Map): the map the cell belongs to
+    __slots__ = ("_map",)
+
     x: int
     y: int
     icon: pygame.Surface
     captured: bool
+    _map: 'Map'
 
-    def __init__(self, x, y) -> None:
+    def __init__(self, map: 'Map', x: int, y: int) -> None:
         """
-        Initialize the entity with the  <icon_file> and given <x> and <y> position on the game.
+        Initialize a view of the cell at <x> and <y> of <map>
         """
         super().__init__(x, y)
-        self.set_icon("../images/sprite_unclaimed.png")
-        self.captured = False
+        self._map = map
+
+    @property
+    def captured(self) -> bool:
+        """
+        Returns true iff the cell is captured in the map
+        """
+        return self._map.is_captured(self.x, self.y)
+
+    @property
+    def icon(self) -> pygame.Surface:
+        """
+        Returns the shared sprite for the captured status of the cell
+        """
+        return load_sprite(TILE_SPRITES[self.captured])
 
     def capture(self) -> None:
         """
-        Changes the Tile status to captured updating its icon
+        Captures the cell in the map, which also changes the icon of the Tile
         """
-        self.captured = True
-        self.set_icon("../images/sprite_claimed.png")
+        self._map.capture(self.x, self.y)